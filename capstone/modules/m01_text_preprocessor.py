@@ -6,10 +6,44 @@ P1 (2-kun amaliyoti) da qurilgan; m02-m09, m11, m15 tomonidan ishlatiladi.
 """
 from __future__ import annotations
 
+import hashlib
+import os
 import re
-from collections import Counter
+import shutil
+import sys
+import tempfile
+from collections import Counter, OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
-_APOSTROPHE_RE = re.compile(r"['’‘]")
+import numpy as np
+
+# Barcha apostrof variantlari (ʻ U+02BB, ʼ U+02BC, ‘ U+2018, ’ U+2019, `) -> ASCII '
+_APOSTROPHES = "ʻʼ‘’`"
+
+# O'zbek kirill -> lotin (2-kun ma'ruzasi). Kontekstsiz, bitta o'tish: "е" so'z
+# boshida ham "e" ga o'tadi ("ye" emas) -- tokenizatsiya uchun bu yetarli.
+_CYR_TO_LAT: dict[str, str] = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo",
+    "ж": "j", "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "x", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "'",
+    "ь": "", "ы": "i", "э": "e", "ю": "yu", "я": "ya",
+    "ў": "o'", "қ": "q", "ғ": "g'", "ҳ": "h",
+}
+
+
+def _build_normalize_table() -> dict[int, str]:
+    """Apostrof + kichik harf + kirill->lotin uchun bitta str.translate jadvali."""
+    table: dict[str, str] = {c: "'" for c in _APOSTROPHES}
+    table.update({c: c.lower() for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"})
+    for cyr, lat in _CYR_TO_LAT.items():
+        table[cyr] = lat
+        table[cyr.upper()] = lat
+    return str.maketrans(table)
+
+
+_NORMALIZE_TABLE = _build_normalize_table()
 _TOKEN_RE = re.compile(r"[a-z][a-z']*")
 
 _DEFAULT_STOPWORDS: frozenset[str] = frozenset({
@@ -33,6 +67,130 @@ _UZ_SUFFIXES: tuple[str, ...] = (
     "lar", "ni", "da", "dan", "ga",
 )
 
+_PARALLEL_MIN_DOCS = 5_000  # bundan kichik batch da pool ishga tushirish o'zini oqlamaydi
+# normalizatsiya/tokenizatsiya o'zgarsa oshiriladi -> eski keshlar eskiradi
+_PIPELINE_VERSION = 2
+_MIN_STEM_LEN = 3          # qo'shimcha kesilgandan keyin qolishi shart bo'lgan uzunlik
+_TRIE_END = ""             # trie tugunida "shu yerda qo'shimcha tugaydi" belgisi
+
+
+def _check_text(text) -> None:
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(
+            "preprocess(): text bo'sh bo'lmasligi kerak. "
+            "Bo'sh string qabul qilinmaydi."
+        )
+
+
+# ─── atomik yozish (m02/m03/m04 artefaktlari ham shulardan foydalanadi) ────────
+# Fayl/katalog vaqtinchalik nom bilan to'liq yoziladi va os.replace bilan
+# joyiga qo'yiladi: mavjud fayllar kesilmaydi (ularni mmap qilgan massivlar
+# eski inode ni o'qishda davom etadi), o'quvchi yarim yozilgan holatni ko'rmaydi.
+
+def _replace_dir(tmp: str, path: str) -> None:
+    """To'liq yozilgan tmp katalogni path o'rniga qo'yadi (eski katalog o'chiriladi).
+
+    POSIX da os.replace bo'sh bo'lmagan katalog ustiga yozolmaydi, shuning
+    uchun eski katalog avval chetga olinadi.
+    """
+    if not os.path.isdir(path):
+        os.replace(tmp, path)
+        return
+    old = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".old-")
+    os.replace(path, old)          # bo'sh katalog ustiga -- ruxsat etilgan
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _save_replace(path: str, arr: np.ndarray) -> None:
+    """np.save ni vaqtinchalik faylga yozib, os.replace bilan joyiga qo'yadi."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                               prefix=".tmp-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.ascontiguousarray(arr))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _build_suffix_trie(suffixes) -> dict:
+    """Qo'shimchalarni teskari (oxiridan boshiga) trie ga joylaydi.
+
+    Token oxiridan bitta o'tishda eng uzun mos qo'shimcha topiladi --
+    har token uchun sorted() + chiziqli endswith skanerlash shart emas.
+    """
+    root: dict = {}
+    for suf in suffixes:
+        node = root
+        for ch in reversed(suf):
+            node = node.setdefault(ch, {})
+        node[_TRIE_END] = len(suf)
+    return root
+
+
+class Vocabulary:
+    """Umumiy, o'suvchi token -> butun son id lug'ati.
+
+    0-id PAD/UNK uchun band (m07/m08/m10 konvensiyasi); haqiqiy tokenlar 1 dan
+    boshlanadi. Tokenlar sys.intern() qilinadi -- bir nechta modul bitta lug'atni
+    ulashganda satrlar xotirada takrorlanmaydi. freeze() dan keyin yangi so'zlar
+    qo'shilmaydi va 0 (UNK) ga aylanadi.
+    """
+
+    PAD_ID = 0
+    PAD = "<pad>"
+
+    def __init__(self, tokens: Iterable[str] | None = None) -> None:
+        self._t2i: dict[str, int] = {}
+        self._i2t: list[str] = [self.PAD]
+        self._frozen = False
+        if tokens is not None:
+            for t in tokens:
+                self.add(t)
+
+    def __len__(self) -> int:
+        return len(self._i2t)          # PAD ham hisobga kiradi
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._t2i
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> None:
+        """Lug'atni qotiradi: bundan keyin noma'lum tokenlar 0 (UNK) bo'ladi."""
+        self._frozen = True
+
+    def add(self, token: str) -> int:
+        """Tokenni qo'shadi (bor bo'lsa mavjud id) va id qaytaradi."""
+        i = self._t2i.get(token)
+        if i is None:
+            if self._frozen:
+                return self.PAD_ID
+            token = sys.intern(token)
+            i = len(self._i2t)
+            self._t2i[token] = i
+            self._i2t.append(token)
+        return i
+
+    def lookup(self, token: str) -> int:
+        """Token id si; lug'atda yo'q bo'lsa 0 (o'smaydi)."""
+        return self._t2i.get(token, self.PAD_ID)
+
+    def token(self, i: int) -> str:
+        return self._i2t[i]
+
+    def encode(self, tokens: list[str]) -> np.ndarray:
+        """Tokenlar ro'yxatini int32 id massiviga aylantiradi (frozen bo'lmasa o'sadi)."""
+        get = self.lookup if self._frozen else self.add
+        return np.fromiter((get(t) for t in tokens), dtype=np.int32, count=len(tokens))
+
+    def decode(self, ids) -> list[str]:
+        return [self._i2t[int(i)] for i in ids]
+
 
 class TextPreprocessor:
     """O'zbek matni uchun tokenizatsiya + normalizatsiya + stemming pipeline.
@@ -40,23 +198,59 @@ class TextPreprocessor:
     Consumed by: m02, m04, m05, m06, m07, m08, m09, m11, m15.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, suffixes: tuple[str, ...] | None = None,
+                 stem_cache_size: int = 100_000,
+                 cache_dir: str | None = None) -> None:
         self._stopwords: set[str] = set(_DEFAULT_STOPWORDS)
+        self._suffixes: tuple[str, ...] = tuple(_UZ_SUFFIXES if suffixes is None else suffixes)
+        self._suffix_trie = _build_suffix_trie(self._suffixes)
+        # so'z shakli -> stem, LRU tartibida (eng eskisi birinchi)
+        self._stem_cache: OrderedDict[str, str] = OrderedDict()
+        self._stem_cache_size = stem_cache_size
+        self._stem_hits = 0
+        self._stem_misses = 0
+        # preprocess_batch natijalari uchun diskdagi ombor (None -- o'chirilgan)
+        self._cache_dir = cache_dir
 
     # ─── ichki metodlar ───────────────────────────────────────────────────────
 
     def _normalize(self, text: str) -> str:
-        text = _APOSTROPHE_RE.sub("'", text)
-        return text.lower()
+        # bitta C-darajadagi o'tish: apostroflar, registr va kirill harflar.
+        # Boshqa yozuvlardagi bosh harflar _TOKEN_RE ga baribir mos kelmaydi.
+        return text.translate(_NORMALIZE_TABLE)
 
     def _tokenize(self, text: str) -> list[str]:
         return _TOKEN_RE.findall(self._normalize(text))
 
+    def _stem_uncached(self, token: str) -> str:
+        """Trie bo'ylab eng uzun qo'shimchani topadi (stem >= 3 harf qolsin)."""
+        node = self._suffix_trie
+        best = 0
+        limit = len(token) - _MIN_STEM_LEN
+        for depth, ch in enumerate(reversed(token), 1):
+            if depth > limit:
+                break
+            node = node.get(ch)
+            if node is None:
+                break
+            if _TRIE_END in node:
+                best = depth
+        return token[:-best] if best else token
+
     def _stem(self, token: str) -> str:
-        for suffix in sorted(_UZ_SUFFIXES, key=len, reverse=True):
-            if token.endswith(suffix) and len(token) - len(suffix) >= 3:
-                return token[: -len(suffix)]
-        return token
+        cache = self._stem_cache
+        stem = cache.get(token)
+        if stem is not None:
+            cache.move_to_end(token)
+            self._stem_hits += 1
+            return stem
+        self._stem_misses += 1
+        stem = self._stem_uncached(token)
+        if self._stem_cache_size > 0:
+            cache[token] = stem
+            if len(cache) > self._stem_cache_size:
+                cache.popitem(last=False)
+        return stem
 
     # ─── ommaviy metodlar ─────────────────────────────────────────────────────
 
@@ -73,11 +267,7 @@ class TextPreprocessor:
         Raises:
             ValueError: Agar text bo'sh string bo'lsa.
         """
-        if not isinstance(text, str) or not text.strip():
-            raise ValueError(
-                "preprocess(): text bo'sh bo'lmasligi kerak. "
-                "Bo'sh string qabul qilinmaydi."
-            )
+        _check_text(text)
         result = []
         for t in self._tokenize(text):
             if len(t) < 2:
@@ -87,28 +277,235 @@ class TextPreprocessor:
             result.append(self._stem(t))
         return result
 
-    def preprocess_batch(self, texts: list[str]) -> list[list[str]]:
-        """preprocess() ni bir ro'yxat uchun qo'llaydi."""
-        return [self.preprocess(t) for t in texts]
+    def preprocess_batch(self, texts: list[str], n_jobs: int = 1,
+                         chunksize: int = 1_000) -> list[list[str]]:
+        """preprocess() ni bir ro'yxat uchun qo'llaydi.
+
+        Args:
+            texts:     Xom matnlar ro'yxati.
+            n_jobs:    Jarayonlar soni; 1 -- ketma-ket, -1 -- barcha CPU yadrolari.
+            chunksize: Har bir jarayonga bir martada yuboriladigan hujjatlar soni.
 
-    def fit_stopwords(self, texts: list[str], max_df: float = 0.85) -> None:
+        Returns:
+            Kirish tartibida token ro'yxatlari. Kichik batch (< _PARALLEL_MIN_DOCS)
+            yoki bitta bo'lak bo'lsa, pool ishga tushirilmaydi -- ketma-ket ishlaydi.
+            cache_dir berilgan bo'lsa, natija matnlar mazmuni va sozlamalar xeshi
+            bo'yicha diskda saqlanadi va keyingi chaqiruvlarda mmap orqali
+            qayta ishlatiladi.
+        """
+        if chunksize < 1:
+            raise ValueError("chunksize musbat butun son bo'lishi kerak.")
+        if self._cache_dir is None:
+            return self._preprocess_batch(texts, n_jobs, chunksize)
+        key = self._store_key(texts)
+        cached = self._store_load(key)
+        if cached is not None:
+            return cached
+        out = self._preprocess_batch(texts, n_jobs, chunksize)
+        self._store_save(key, out)
+        return out
+
+    def _preprocess_batch(self, texts: list[str], n_jobs: int,
+                          chunksize: int) -> list[list[str]]:
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs <= 1 or len(texts) < max(_PARALLEL_MIN_DOCS, 2 * chunksize):
+            return [self.preprocess(t) for t in texts]
+        chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+        # stopwordlar (fit_stopwords natijasi ham) va qo'shimchalar har workerga
+        # bir marta, initializer orqali uzatiladi -- har bo'lak bilan emas
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(chunks)),
+            initializer=_init_worker,
+            initargs=(self._suffixes, frozenset(self._stopwords), self._stem_cache_size),
+        ) as ex:
+            out: list[list[str]] = []
+            for part in ex.map(_preprocess_chunk, chunks):   # map tartibni saqlaydi
+                out.extend(part)
+        return out
+
+    # ─── diskdagi token ombori ────────────────────────────────────────────────
+
+    def config_fingerprint(self) -> str:
+        """Natijaga ta'sir qiluvchi sozlamalar (stopword, qo'shimcha, versiya) xeshi."""
+        h = hashlib.sha256()
+        h.update(f"v{_PIPELINE_VERSION}|min_stem={_MIN_STEM_LEN}\n".encode())
+        h.update("\n".join(self._suffixes).encode("utf-8"))
+        h.update(b"\0")
+        h.update("\n".join(sorted(self._stopwords)).encode("utf-8"))
+        return h.hexdigest()
+
+    def _store_key(self, texts: list[str]) -> str:
+        """Kesh kaliti = matnlar mazmuni xeshi + preprocessor sozlamalari xeshi."""
+        h = hashlib.sha256(self.config_fingerprint().encode())
+        for t in texts:
+            _check_text(t)      # xeshlashdan oldin -- keshsiz yo'l bilan bir xil xato
+            b = t.encode("utf-8")
+            h.update(len(b).to_bytes(8, "little"))   # uzunlik-prefiks: chegaralar aniq
+            h.update(b)
+        return h.hexdigest()
+
+    def _store_load(self, key: str) -> list[list[str]] | None:
+        d = os.path.join(self._cache_dir, key)
+        if not os.path.isdir(d):
+            return None
+        with open(os.path.join(d, "vocab.txt"), encoding="utf-8") as f:
+            words = np.array([Vocabulary.PAD] + f.read().split("\n")[:-1], dtype=object)
+        values = np.load(os.path.join(d, "values.npy"), mmap_mode="r")
+        offsets = np.load(os.path.join(d, "offsets.npy"), mmap_mode="r")
+        flat = words[values]
+        return [flat[a:b].tolist() for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def _store_save(self, key: str, token_lists: list[list[str]]) -> None:
+        """Natijani (vocab.txt, values.npy, offsets.npy) sifatida atomik yozadi."""
+        vocab = Vocabulary()
+        lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64,
+                              count=len(token_lists))
+        offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        values = np.fromiter((vocab.add(t) for toks in token_lists for t in toks),
+                             dtype=np.int32, count=int(offsets[-1]))
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=self._cache_dir, prefix=".tmp-")
+        try:
+            with open(os.path.join(tmp, "vocab.txt"), "w", encoding="utf-8") as f:
+                f.writelines(vocab.token(i) + "\n" for i in range(1, len(vocab)))
+            np.save(os.path.join(tmp, "values.npy"), values)
+            np.save(os.path.join(tmp, "offsets.npy"), offsets)
+            os.replace(tmp, os.path.join(self._cache_dir, key))
+        except OSError:
+            # parallel yozuvchi bizdan oldin tugatgan bo'lishi mumkin -- keshsiz davom etamiz
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def preprocess_iter(self, texts: Iterable[str],
+                        skip_empty: bool = True) -> Iterator[list[str]]:
+        """preprocess() ni istalgan iterable ustida dangasa (lazy) qo'llaydi.
+
+        Generator: bir vaqtda faqat bitta hujjat xotirada turadi, shuning uchun
+        RAM dan katta korpuslar ham m05/m06 o'qitishiga oqib o'tadi. Ochiq fayl
+        (bir qatorda bitta hujjat, masalan d02_checkpoints/uz_news_mini.txt)
+        to'g'ridan-to'g'ri berilishi mumkin.
+
+        Args:
+            texts:      Matnlar iterable'i (ro'yxat, generator, fayl obyekti).
+            skip_empty: True bo'lsa bo'sh qatorlar tashlab ketiladi; False
+                        bo'lsa preprocess() kabi ValueError ko'tariladi.
+
+        Yields:
+            Har hujjat uchun tozalangan tokenlar ro'yxati.
+        """
+        for text in texts:
+            if skip_empty and not text.strip():
+                continue
+            yield self.preprocess(text)
+
+    def preprocess_ids(self, text: str, vocab: Vocabulary) -> np.ndarray:
+        """preprocess() natijasini vocab bo'yicha int32 id massivi sifatida qaytaradi."""
+        return vocab.encode(self.preprocess(text))
+
+    def preprocess_batch_ids(self, texts: Iterable[str],
+                             vocab: Vocabulary) -> tuple[np.ndarray, np.ndarray]:
+        """Batch ni ragged (values, offsets) juftligi sifatida qaytaradi.
+
+        i-hujjat id lari: values[offsets[i]:offsets[i + 1]]. Oraliq
+        list[list[str]] yig'ilmaydi -- hujjatlar preprocess_iter orqali oqadi.
+
+        Returns:
+            values:  (jami_tokenlar,) int32 -- barcha hujjatlar id lari ketma-ket.
+            offsets: (n_docs + 1,) int64 -- har hujjat boshlanishi, offsets[0] == 0.
+        """
+        get = vocab.lookup if vocab.frozen else vocab.add
+        values: list[int] = []
+        offsets: list[int] = [0]
+        for toks in self.preprocess_iter(texts, skip_empty=False):
+            values.extend(get(t) for t in toks)
+            offsets.append(len(values))
+        return np.asarray(values, dtype=np.int32), np.asarray(offsets, dtype=np.int64)
+
+    def stem_cache_info(self) -> dict[str, int]:
+        """Stem keshining statistikasi: {'hits', 'misses', 'size', 'maxsize'}."""
+        return {
+            "hits": self._stem_hits,
+            "misses": self._stem_misses,
+            "size": len(self._stem_cache),
+            "maxsize": self._stem_cache_size,
+        }
+
+    def fit_stopwords(self, texts: Iterable[str], max_df: float = 0.85,
+                      max_counters: int | None = None) -> None:
         """Korpus-spesifik stopwordlarni chastota bo'yicha aniqlaydi.
 
         max_df ulushidan ortiq hujjatlarda uchraydigan so'zlar
         stopwords ga qo'shiladi.
 
         Args:
-            texts:  Xom matnlar ro'yxati.
-            max_df: [0,1] — hujjatlar ulushidan ortiq uchraydigan so'zlar
-                    stopword sifatida belgilanadi. Default 0.85.
+            texts:        Xom matnlar (ro'yxat yoki bir martalik iterable/fayl).
+            max_df:       [0,1] — hujjatlar ulushidan ortiq uchraydigan so'zlar
+                          stopword sifatida belgilanadi. Default 0.85.
+            max_counters: None bo'lsa aniq Counter ishlatiladi. Son berilsa,
+                          hujjat chastotasi ko'pi bilan shuncha hisoblagichli
+                          Misra-Gries heavy-hitters strukturasida taxminlanadi:
+                          xotira korpus hajmiga bog'liq emas, har so'z DF i
+                          ko'pi bilan N / (max_counters + 1) ga kam baholanadi,
+                          N -- har hujjatdagi noyob tokenlar sonlari yig'indisi
+                          (ortiqcha stopword qo'shilmaydi, lekin chegaraga
+                          yaqin so'zlar tushib qolishi mumkin).
         """
-        n_docs = len(texts)
+        if max_counters is None:
+            df, n_docs = self._exact_df(texts)
+        else:
+            if max_counters < 1:
+                raise ValueError("max_counters musbat butun son bo'lishi kerak.")
+            df, n_docs = self._heavy_hitter_df(texts, max_counters)
         if n_docs == 0:
             return
         threshold = max(1, int(n_docs * max_df))
-        df: Counter[str] = Counter()
-        for text in texts:
-            df.update(set(self._tokenize(text)))
         for word, count in df.items():
             if count >= threshold:
                 self._stopwords.add(word)
+
+    def _exact_df(self, texts: Iterable[str]) -> tuple[Counter[str], int]:
+        df: Counter[str] = Counter()
+        n_docs = 0
+        for text in texts:
+            n_docs += 1
+            df.update(set(self._tokenize(text)))
+        return df, n_docs
+
+    def _heavy_hitter_df(self, texts: Iterable[str],
+                         max_counters: int) -> tuple[dict[str, int], int]:
+        """Misra-Gries: hujjat chastotasini max_counters ta hisoblagichda taxminlaydi."""
+        counts: dict[str, int] = {}
+        n_docs = 0
+        for text in texts:
+            n_docs += 1
+            for word in set(self._tokenize(text)):
+                if word in counts:
+                    counts[word] += 1
+                elif len(counts) < max_counters:
+                    counts[word] = 1
+                else:
+                    # joy yo'q: barcha hisoblagichlarni 1 ga kamaytirib, nollarni
+                    # o'chiramiz (amortizatsiyalangan O(1) -- jami kamaytirishlar
+                    # jami qo'shishlardan oshmaydi)
+                    for w in list(counts):
+                        if counts[w] == 1:
+                            del counts[w]
+                        else:
+                            counts[w] -= 1
+        return counts, n_docs
+
+
+# ─── process-pool workerlari (modul darajasida -- pickle qilinishi uchun) ──────
+_WORKER_PRE: TextPreprocessor | None = None
+
+
+def _init_worker(suffixes: tuple[str, ...], stopwords: frozenset[str],
+                 stem_cache_size: int) -> None:
+    global _WORKER_PRE
+    _WORKER_PRE = TextPreprocessor(suffixes=suffixes, stem_cache_size=stem_cache_size)
+    _WORKER_PRE._stopwords = set(stopwords)
+
+
+def _preprocess_chunk(chunk: list[str]) -> list[list[str]]:
+    return [_WORKER_PRE.preprocess(t) for t in chunk]
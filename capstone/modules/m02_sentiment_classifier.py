@@ -8,16 +8,50 @@ Consumed by: M4 (FastAPI app.py), Day 16 (agent tool).
 """
 from __future__ import annotations
 
+import json
+import math
+import os
 import pickle
+import shutil
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, product
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import numpy as np
+from sklearn.base import clone
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
 from sklearn.naive_bayes import MultinomialNB
 
 try:
-    from m01_text_preprocessor import TextPreprocessor
+    from m01_text_preprocessor import TextPreprocessor, _replace_dir
 except ImportError:  # paket sifatida import qilinganda
-    from .m01_text_preprocessor import TextPreprocessor
+    from .m01_text_preprocessor import TextPreprocessor, _replace_dir
+
+_LABELS: tuple[str, ...] = ("ijobiy", "salbiy")   # qulflangan yorliqlar
+_HASH_FEATURES = 2 ** 20                          # sgd-hash: xesh fazosi o'lchami
+
+_NPY_FORMAT = "uznlp-sentiment"                  # save(format="npy") header belgisi
+_NPY_VERSION = 1
+
+_DEFAULT_GRIDS: dict[str, dict[str, list]] = {
+    "logreg": {"C": [0.01, 0.1, 1.0, 10.0, 100.0]},
+    "nb": {"alpha": [0.01, 0.1, 0.5, 1.0, 2.0]},
+    "sgd-hash": {"alpha": [1e-6, 1e-5, 1e-4, 1e-3]},
+}
+
+
+def _identity_analyzer(tokens: list[str]) -> list[str]:
+    """m01 tokenlari tayyor -- vektorlashtiruvchi ularni qayta tokenlamaydi.
+
+    Modul darajasida (lambda emas), chunki vektorlashtiruvchi pickle qilinadi.
+    """
+    return tokens
 
 
 class SentimentClassifier:
@@ -27,36 +61,104 @@ class SentimentClassifier:
     """
 
     def __init__(self, model: str = "logreg") -> None:
-        if model not in ("logreg", "nb"):
-            raise ValueError("model 'logreg' yoki 'nb' bo'lishi kerak.")
+        if model not in ("logreg", "nb", "sgd-hash"):
+            raise ValueError("model 'logreg', 'nb' yoki 'sgd-hash' bo'lishi kerak.")
         self._model_name = model
         self._pre = TextPreprocessor()
-        self._vec = TfidfVectorizer()
-        self._clf = (
-            LogisticRegression(max_iter=1000)
-            if model == "logreg"
-            else MultinomialNB(alpha=1.0)
-        )
+        self._vec, self._clf = self._make_model(model)
+        # True: m01 token ro'yxatlari vektorlashtiruvchiga to'g'ridan-to'g'ri
+        # beriladi. Eski (satr-birlashtirish) artefaktlar load() da False oladi.
+        self._pretokenized = True
         self._fitted = False
+        self._compiled: dict | None = None   # compile() natijasi (faqat logreg)
+
+    @staticmethod
+    def _make_model(model: str):
+        """(vektorlashtiruvchi, klassifikator) juftligini yaratadi.
 
-    def _prep(self, text: str) -> str:
-        """m01 bilan tozalab, TF-IDF uchun bo'sh-joy bilan birlashtiradi."""
+        sgd-hash: lug'at saqlamaydigan HashingVectorizer + partial_fit qila
+        oladigan SGD logistik regressiya -- RAM dan katta korpuslar uchun.
+        """
+        if model == "sgd-hash":
+            vec = HashingVectorizer(n_features=_HASH_FEATURES, alternate_sign=False,
+                                    analyzer=_identity_analyzer)
+            return vec, SGDClassifier(loss="log_loss", random_state=42)
+        vec = TfidfVectorizer(analyzer=_identity_analyzer)
+        if model == "logreg":
+            return vec, LogisticRegression(max_iter=1000)
+        return vec, MultinomialNB(alpha=1.0)
+
+    def _prep(self, text: str) -> list[str] | str:
+        """m01 bilan tozalaydi: tokenlar ro'yxati (pretokenized) yoki eski
+        artefaktlar uchun bo'sh-joy bilan birlashtirilgan satr."""
         if not isinstance(text, str) or not text.strip():
-            return ""
-        return " ".join(self._pre.preprocess(text))
+            return [] if self._pretokenized else ""
+        toks = self._pre.preprocess(text)
+        return toks if self._pretokenized else " ".join(toks)
 
     def fit(self, texts: list[str], labels: list[str]) -> None:
         """Modelni o'qitadi. labels: 'ijobiy' yoki 'salbiy'."""
         if len(texts) != len(labels):
             raise ValueError("texts va labels uzunligi teng bo'lishi kerak.")
-        X = self._vec.fit_transform([self._prep(t) for t in texts])
+        self._fit_docs([self._prep(t) for t in texts], labels)
+
+    def _fit_docs(self, docs: list, labels: list[str]) -> None:
+        if self._model_name == "sgd-hash":
+            X = self._vec.transform(docs)         # xesh: fit qilinadigan lug'at yo'q
+        else:
+            X = self._vec.fit_transform(docs)
         self._clf.fit(X, labels)
         self._fitted = True
+        self._compiled = None
+
+    def partial_fit(self, texts: list[str], labels: list[str]) -> None:
+        """sgd-hash modelini bitta minibatch bilan qo'shimcha o'qitadi.
+
+        Yangi belgilangan sharhlar kelganda modelni noldan qayta o'qitmasdan
+        yangilash uchun. Faqat model='sgd-hash' uchun.
+        """
+        if self._model_name != "sgd-hash":
+            raise ValueError("partial_fit() faqat model='sgd-hash' uchun.")
+        if len(texts) != len(labels):
+            raise ValueError("texts va labels uzunligi teng bo'lishi kerak.")
+        if not texts:
+            return
+        X = self._vec.transform([self._prep(t) for t in texts])
+        if self._fitted:
+            clf = self._clf
+            if not clf.coef_.flags.writeable:
+                # "npy" artefakti faqat-o'qish mmap; SGD og'irliklarni joyida yangilaydi
+                clf.coef_ = np.array(clf.coef_)
+                clf.intercept_ = np.array(clf.intercept_)
+            clf.partial_fit(X, labels)
+        else:
+            self._clf.partial_fit(X, labels, classes=list(_LABELS))
+        self._fitted = True
+
+    def fit_stream(self, pairs: Iterable[tuple[str, str]],
+                   batch_size: int = 1_000) -> None:
+        """(matn, yorliq) juftliklari oqimidan sgd-hash modelini o'qitadi.
+
+        Oqim batch_size o'lchamdagi minibatchlarga bo'linib partial_fit() ga
+        beriladi -- xotirada bir vaqtda faqat bitta minibatch turadi.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size musbat butun son bo'lishi kerak.")
+        it = iter(pairs)
+        while True:
+            batch = list(islice(it, batch_size))
+            if not batch:
+                break
+            texts, labels = zip(*batch)
+            self.partial_fit(list(texts), list(labels))
 
     def predict(self, text: str) -> str:
         """Bitta matn uchun 'ijobiy' yoki 'salbiy' qaytaradi."""
         if not self._fitted:
             raise ValueError("Avval fit() ni chaqiring.")
+        if self._compiled is not None:
+            c = self._compiled
+            return c["classes"][1] if self._compiled_logit(text) > 0 else c["classes"][0]
         X = self._vec.transform([self._prep(text)])
         return str(self._clf.predict(X)[0])
 
@@ -64,12 +166,209 @@ class SentimentClassifier:
         """Ehtimolliklar: {'ijobiy': 0.82, 'salbiy': 0.18}."""
         if not self._fitted:
             raise ValueError("Avval fit() ni chaqiring.")
+        if self._compiled is not None:
+            neg, pos = self._compiled["classes"]
+            p = 1.0 / (1.0 + math.exp(-self._compiled_logit(text)))
+            return {neg: 1.0 - p, pos: p}
         X = self._vec.transform([self._prep(text)])
         probs = self._clf.predict_proba(X)[0]
         return {str(c): float(p) for c, p in zip(self._clf.classes_, probs)}
 
-    def save(self, path: str) -> None:
-        """Vektorlashtiruvchi va modelni pickle orqali saqlaydi."""
+    # ─── kompilyatsiya qilingan chiziqli baholovchi (logreg) ──────────────────
+    def compile(self) -> None:
+        """O'qitilgan TF-IDF + LogReg ni tekis token -> (idf, coef*idf) jadvalga aylantiradi.
+
+        Keyin predict()/predict_proba() sklearn validatsiyasi va sparse matritsa
+        qurmasdan, to'g'ridan-to'g'ri lug'at bo'yicha hisoblaydi:
+            z = b + sum_t c_t * coef_t * idf_t / ||c * idf||_2,  p = sigmoid(z)
+        Natija sklearn ehtimolliklari bilan 1e-9 aniqlikda mos. fit()/load()
+        kompilyatsiyani bekor qiladi -- qaytadan chaqirish kerak.
+        """
+        if not self._fitted:
+            raise ValueError("Avval fit() ni chaqiring.")
+        if self._model_name != "logreg":
+            raise ValueError("compile() faqat model='logreg' uchun.")
+        vec = self._vec
+        if vec.norm != "l2" or vec.sublinear_tf or not vec.use_idf or vec.binary:
+            raise ValueError("compile() faqat standart TfidfVectorizer sozlamalari uchun.")
+        if len(self._clf.classes_) != 2:
+            raise ValueError("compile() faqat ikki sinfli (binary) model uchun.")
+        coef = self._clf.coef_[0]
+        idf = vec.idf_
+        weights = {
+            tok: (float(idf[j]), float(coef[j] * idf[j]))
+            for tok, j in vec.vocabulary_.items()
+        }
+        self._compiled = {
+            "weights": weights,
+            "intercept": float(self._clf.intercept_[0]),
+            "classes": [str(c) for c in self._clf.classes_],
+            "analyzer": _identity_analyzer if self._pretokenized else vec.build_analyzer(),
+        }
+
+    def _compiled_logit(self, text: str) -> float:
+        c = self._compiled
+        weights = c["weights"]
+        num = sq = 0.0
+        for tok, n in Counter(c["analyzer"](self._prep(text))).items():
+            entry = weights.get(tok)
+            if entry is None:
+                continue
+            idf, w = entry
+            num += n * w
+            sq += (n * idf) ** 2
+        return c["intercept"] + (num / math.sqrt(sq) if sq else 0.0)
+
+    # ─── giperparametr qidiruvi ───────────────────────────────────────────────
+    def tune(self, texts: list[str], labels: list[str],
+             param_grid: dict[str, list] | None = None, cv: int = 5,
+             n_jobs: int = 1, refit: bool = True) -> dict:
+        """Klassifikator giperparametrlarini stratifikatsiyalangan CV bilan tanlaydi.
+
+        m01 preprocessing bir marta, har fold uchun TF-IDF matritsalari ham
+        bir marta hisoblanib keshlanadi -- har sinov faqat klassifikatorni
+        qayta o'qitadi. Sinovlar (parametrlar x fold) process pool bo'ylab
+        taqsimlanadi; fold matritsalari har workerga initializer orqali bir
+        marta uzatiladi.
+
+        Args:
+            texts, labels: O'qitish ma'lumotlari (fit() dagidek).
+            param_grid:    {'C': [...]} kabi to'r; None bo'lsa model uchun standart.
+            cv:            Fold lar soni.
+            n_jobs:        Jarayonlar soni; 1 -- ketma-ket, -1 -- barcha yadrolar.
+            refit:         True bo'lsa eng yaxshi parametrlar bilan butun
+                           ma'lumotda qayta o'qitiladi.
+
+        Returns:
+            {'best_params', 'best_score', 'results': [{'params', 'mean_score',
+             'scores'}, ...], 'timing': {'preprocess_s', 'vectorize_s',
+             'search_s', 'refit_s', 'total_s'}} -- ball: makro-F1.
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts va labels uzunligi teng bo'lishi kerak.")
+        if param_grid is None:
+            param_grid = _DEFAULT_GRIDS[self._model_name]
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        timing: dict[str, float] = {}
+        t_start = t0 = time.perf_counter()
+
+        docs = [self._prep(t) for t in texts]
+        timing["preprocess_s"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        folds = []
+        skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+        for tr, va in skf.split(docs, labels):
+            vec = clone(self._vec)
+            tr_docs = [docs[i] for i in tr]
+            va_docs = [docs[i] for i in va]
+            if self._model_name == "sgd-hash":
+                X_tr = vec.transform(tr_docs)
+            else:
+                X_tr = vec.fit_transform(tr_docs)
+            folds.append((X_tr, [labels[i] for i in tr],
+                          vec.transform(va_docs), [labels[i] for i in va]))
+        timing["vectorize_s"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        names = sorted(param_grid)
+        combos = [dict(zip(names, vals)) for vals in product(*(param_grid[n] for n in names))]
+        tasks = [(ci, fi, combos[ci]) for ci in range(len(combos)) for fi in range(cv)]
+        template = clone(self._clf)
+        if n_jobs <= 1 or len(tasks) < 2:
+            _init_tune_worker(folds, template)
+            try:
+                scores = [_run_tune_task(t) for t in tasks]
+            finally:
+                _init_tune_worker(None, None)
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)),
+                                     initializer=_init_tune_worker,
+                                     initargs=(folds, template)) as ex:
+                scores = list(ex.map(_run_tune_task, tasks))
+        timing["search_s"] = time.perf_counter() - t0
+
+        results = []
+        for ci, params in enumerate(combos):
+            fold_scores = [sc for (c, _, _), sc in zip(tasks, scores) if c == ci]
+            results.append({"params": params,
+                            "mean_score": sum(fold_scores) / len(fold_scores),
+                            "scores": fold_scores})
+        best = max(results, key=lambda r: r["mean_score"])
+
+        t0 = time.perf_counter()
+        if refit:
+            self._clf = clone(self._clf).set_params(**best["params"])
+            self._fit_docs(docs, labels)
+        timing["refit_s"] = time.perf_counter() - t0
+        timing["total_s"] = time.perf_counter() - t_start
+        return {"best_params": best["params"], "best_score": best["mean_score"],
+                "results": results, "timing": timing}
+
+    # ─── batch bashorat ────────────────────────────────────────────────────────
+    def _chunks(self, texts: list[str], chunk_size: int | None):
+        if chunk_size is None:
+            yield texts
+            return
+        if chunk_size < 1:
+            raise ValueError("chunk_size musbat butun son bo'lishi kerak.")
+        for i in range(0, len(texts), chunk_size):
+            yield texts[i:i + chunk_size]
+
+    def predict_batch(self, texts: list[str],
+                      chunk_size: int | None = None) -> list[str]:
+        """Matnlar ro'yxati uchun sentiment; natija kirish tartibida.
+
+        Har bo'lak bitta CSR matritsaga vektorlashtiriladi va klassifikator
+        bir marta chaqiriladi -- har matn uchun alohida transform/predict emas.
+
+        Args:
+            texts:      Xom matnlar ro'yxati.
+            chunk_size: None -- hammasi bitta matritsada; aks holda shu
+                        o'lchamdagi bo'laklar (juda katta ro'yxatlar uchun xotira).
+        """
+        if not self._fitted:
+            raise ValueError("Avval fit() ni chaqiring.")
+        out: list[str] = []
+        for part in self._chunks(texts, chunk_size):
+            if not part:
+                continue
+            X = self._vec.transform([self._prep(t) for t in part])
+            out.extend(str(y) for y in self._clf.predict(X))
+        return out
+
+    def predict_proba_batch(self, texts: list[str],
+                            chunk_size: int | None = None) -> list[dict[str, float]]:
+        """predict_proba() ning batch varianti; natija kirish tartibida."""
+        if not self._fitted:
+            raise ValueError("Avval fit() ni chaqiring.")
+        classes = [str(c) for c in self._clf.classes_]
+        out: list[dict[str, float]] = []
+        for part in self._chunks(texts, chunk_size):
+            if not part:
+                continue
+            X = self._vec.transform([self._prep(t) for t in part])
+            for row in self._clf.predict_proba(X):
+                out.append({c: float(p) for c, p in zip(classes, row)})
+        return out
+
+    def save(self, path: str, format: str = "pickle") -> None:
+        """Vektorlashtiruvchi va modelni saqlaydi.
+
+        Args:
+            path:   pickle uchun fayl yo'li; "npy" uchun katalog yo'li.
+            format: "pickle" (standart) yoki "npy" -- pickle'siz, versiyalangan
+                    katalog: header.json + lug'at (packed string table) +
+                    idf/koeffitsiyentlar .npy fayllari. load() uni mmap orqali
+                    millisekundlarda ochadi, bir nechta worker jarayoni bir xil
+                    fizik sahifalarni ulashadi, begona artefakt kod bajara olmaydi.
+        """
+        if format == "npy":
+            self._save_npy(path)
+            return
+        if format != "pickle":
+            raise ValueError("format 'pickle' yoki 'npy' bo'lishi kerak.")
         with open(path, "wb") as f:
             pickle.dump(
                 {
@@ -77,15 +376,136 @@ class SentimentClassifier:
                     "clf": self._clf,
                     "model_name": self._model_name,
                     "fitted": self._fitted,
+                    "pretokenized": self._pretokenized,
                 },
                 f,
             )
 
     def load(self, path: str) -> None:
-        """Saqlangan modelni yuklaydi."""
+        """Saqlangan modelni yuklaydi (katalog bo'lsa -- "npy" formati)."""
+        if os.path.isdir(path):
+            self._load_npy(path)
+            return
         with open(path, "rb") as f:
             state = pickle.load(f)
         self._vec = state["vec"]
         self._clf = state["clf"]
         self._model_name = state["model_name"]
         self._fitted = state["fitted"]
+        self._pretokenized = state.get("pretokenized", False)
+        self._compiled = None
+
+    # ─── "npy" artefakt formati ───────────────────────────────────────────────
+    def _save_npy(self, path: str) -> None:
+        if not self._fitted:
+            raise ValueError("Avval fit() ni chaqiring.")
+        clf = self._clf
+        header: dict = {
+            "format": _NPY_FORMAT,
+            "version": _NPY_VERSION,
+            "model_name": self._model_name,
+            "pretokenized": self._pretokenized,
+            "classes": [str(c) for c in clf.classes_],
+        }
+        arrays: dict[str, np.ndarray] = {}
+        if self._model_name == "sgd-hash":
+            header["n_features"] = self._vec.n_features
+            header["alternate_sign"] = self._vec.alternate_sign
+            header["t_"] = float(clf.t_)        # partial_fit o'rganish tezligi jadvali uchun
+        else:
+            vocab = sorted(self._vec.vocabulary_, key=self._vec.vocabulary_.get)
+            encoded = [w.encode("utf-8") for w in vocab]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            arrays["vocab_blob"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            arrays["vocab_offsets"] = offsets
+            arrays["idf"] = np.asarray(self._vec.idf_, dtype=np.float64)
+        if self._model_name == "nb":
+            arrays["feature_log_prob"] = clf.feature_log_prob_
+            arrays["class_log_prior"] = clf.class_log_prior_
+        else:
+            arrays["coef"] = clf.coef_
+            arrays["intercept"] = clf.intercept_
+        # vaqtinchalik katalogga yoziladi va os.replace bilan joyiga qo'yiladi:
+        # o'quvchilar hech qachon eski/yangi fayllar aralashmasini ko'rmaydi
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            for name, arr in arrays.items():
+                np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(arr))
+            with open(os.path.join(tmp, "header.json"), "w", encoding="utf-8") as f:
+                json.dump(header, f, ensure_ascii=False, indent=2)
+            _replace_dir(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _load_npy(self, path: str) -> None:
+        with open(os.path.join(path, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != _NPY_FORMAT:
+            raise ValueError(f"{path}: SentimentClassifier artefakti emas.")
+        if header.get("version", 0) > _NPY_VERSION:
+            raise ValueError(
+                f"{path}: artefakt versiyasi {header['version']} -- "
+                f"bu kod faqat <= {_NPY_VERSION} ni o'qiydi."
+            )
+
+        def arr(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, name + ".npy"),
+                           mmap_mode="r", allow_pickle=False)
+
+        model = header["model_name"]
+        analyzer = _identity_analyzer if header["pretokenized"] else "word"
+        if model == "sgd-hash":
+            vec = HashingVectorizer(n_features=header["n_features"],
+                                    alternate_sign=header["alternate_sign"],
+                                    analyzer=analyzer)
+        else:
+            offsets = arr("vocab_offsets")
+            raw = arr("vocab_blob").tobytes()     # offsetlar baytlarda (UTF-8)
+            vec = TfidfVectorizer(analyzer=analyzer)
+            vec.vocabulary_ = {
+                raw[offsets[j]:offsets[j + 1]].decode("utf-8"): j
+                for j in range(len(offsets) - 1)
+            }
+            vec.idf_ = arr("idf")
+        classes = np.asarray(header["classes"])
+        if model == "nb":
+            clf = MultinomialNB(alpha=1.0)
+            clf.feature_log_prob_ = arr("feature_log_prob")
+            clf.class_log_prior_ = arr("class_log_prior")
+        else:
+            clf = (LogisticRegression(max_iter=1000) if model == "logreg"
+                   else SGDClassifier(loss="log_loss", random_state=42))
+            clf.coef_ = arr("coef")
+            clf.intercept_ = arr("intercept")
+            if model == "sgd-hash":
+                clf.t_ = header["t_"]
+        clf.classes_ = classes
+        clf.n_features_in_ = (header["n_features"] if model == "sgd-hash"
+                              else len(vec.vocabulary_))
+        self._vec, self._clf = vec, clf
+        self._model_name = model
+        self._pretokenized = header["pretokenized"]
+        self._fitted = True
+        self._compiled = None
+
+
+# ─── tune() workerlari (modul darajasida -- pickle qilinishi uchun) ────────────
+_TUNE_FOLDS: list | None = None
+_TUNE_TEMPLATE = None
+
+
+def _init_tune_worker(folds, template) -> None:
+    global _TUNE_FOLDS, _TUNE_TEMPLATE
+    _TUNE_FOLDS, _TUNE_TEMPLATE = folds, template
+
+
+def _run_tune_task(task) -> float:
+    _, fold, params = task
+    X_tr, y_tr, X_va, y_va = _TUNE_FOLDS[fold]
+    clf = clone(_TUNE_TEMPLATE).set_params(**params)
+    clf.fit(X_tr, y_tr)
+    return float(f1_score(y_va, clf.predict(X_va), average="macro"))
@@ -6,11 +6,32 @@ P3 (4-kun amaliyoti) da qurilgan; m04 (LSH), m08 (RNN init) tomonidan ishlatilad
 
 Kaggle: gensim KeyedVectors .kv (cc_uz_100k.kv) yuklanadi.
 Offline: word2vec matn formati (.vec) gensimsiz, toza numpy bilan o'qiladi.
+Ikkilik ombor (save_binary): katalog -- vocab.txt + raw.npy + norm.npy;
+load() uni mmap orqali ochadi (bir martalik konvertatsiyadan keyin).
 """
 from __future__ import annotations
 
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Collection
+from itertools import islice
+
 import numpy as np
 
+try:
+    from m01_text_preprocessor import _replace_dir, _save_replace
+except ImportError:   # paket sifatida import qilinganda
+    from .m01_text_preprocessor import _replace_dir, _save_replace
+
+_BIN_FORMAT = "uznlp-embeddings"   # ikkilik ombor header belgisi
+_BIN_VERSION = 1
+_SIM_BLOCK_ELEMS = 2 ** 24         # most_similar_batch: (q, V) blokidagi elementlar (~64MB)
+_BLOCK_LINES = 16_384              # .vec parser: bitta float parse dagi qatorlar soni
+
 
 class PretrainedEmbedder:
     """Oldindan o'qitilgan Word2Vec/.kv embeddinglarini boshqaradi.
@@ -24,17 +45,47 @@ class PretrainedEmbedder:
         self._raw: np.ndarray | None = None   # (n, dim) xom vektorlar
         self._norm: np.ndarray | None = None  # (n, dim) L2-normallashtirilgan (kosinus uchun)
         self._dim: int = 0
+        # kvantlash (quantize): _raw tashlanadi, _norm float16/int8 da saqlanadi
+        self._quant: str | None = None                 # None | 'float16' | 'int8'
+        self._norm_scale: np.ndarray | None = None     # (n,) int8 qator masshtablari
+        self._row_norms: np.ndarray | None = None      # (n,) xom vektor normalari
+        # IVF (inverted file) ANN indeksi: build_index() / load_index()
+        self._ivf_centroids: np.ndarray | None = None  # (L, dim) normallashtirilgan markazlar
+        self._ivf_offsets: np.ndarray | None = None    # (L + 1,) CSR: ro'yxat chegaralari
+        self._ivf_ids: np.ndarray | None = None        # (n,) so'z indekslari, ro'yxat bo'yicha
+        self._nprobe: int = 8
 
     # ─── yuklash ──────────────────────────────────────────────────────────────
-    def load(self, path: str) -> None:
-        """Gensim KeyedVectors (.kv) yoki word2vec matn (.vec) faylni yuklaydi."""
+    def load(self, path: str, max_vocab: int | None = None,
+             restrict_to: Collection[str] | None = None) -> None:
+        """Gensim KeyedVectors (.kv), word2vec matn (.vec) yoki ikkilik omborni yuklaydi.
+
+        path katalog bo'lsa -- save_binary() ombori: matritsalar np.load(mmap_mode='r')
+        bilan dangasa ochiladi, ya'ni ishga tushish vaqti va eng yuqori RAM
+        lug'at hajmiga deyarli bog'liq emas (sahifalar kerak bo'lganda o'qiladi).
+
+        Args:
+            path:        .kv / .vec fayl yoki save_binary() katalogi.
+            max_vocab:   Faqat birinchi N ta (eng ko'p uchraydigan) so'z.
+            restrict_to: Faqat shu to'plamdagi so'zlar (masalan, korpus lug'ati).
+                         Ikkalasi berilsa -- birinchi N ichidan filtrlanadi.
+        """
+        self._drop_index()
+        self._quant = None
+        self._norm_scale = self._row_norms = None
+        if os.path.isdir(path):
+            self._load_binary(path, max_vocab, restrict_to)
+            return
         if path.endswith(".kv"):
             from gensim.models import KeyedVectors   # faqat Kaggle/onlayn
             kv = KeyedVectors.load(path)
             words = list(kv.index_to_key)
             mat = np.asarray(kv.vectors, dtype=np.float32)
+            keep = self._select(words, max_vocab, restrict_to)
+            if keep is not None:
+                words, mat = [words[i] for i in keep], mat[keep]
         else:
-            words, mat = self._load_text(path)
+            words, mat = self._load_text(path, max_vocab, restrict_to)
         self._words = words
         self._w2i = {w: i for i, w in enumerate(words)}
         self._raw = mat.astype(np.float32)
@@ -43,22 +94,143 @@ class PretrainedEmbedder:
         norms[norms == 0] = 1.0
         self._norm = (mat / norms).astype(np.float32)
 
+    def save_binary(self, path: str) -> None:
+        """Yuklangan vektorlarni ikkilik omborga (katalog) bir martalik yozadi.
+
+        Tarkib: header.json, vocab.txt (qatorda bitta so'z), raw.npy va
+        oldindan L2-normallashtirilgan norm.npy (ikkalasi float32). Kvantlangan
+        bo'lsa raw.npy o'rniga row_norms.npy, norm.npy float16/int8 va
+        (int8 uchun) norm_scale.npy yoziladi.
+        """
+        if self._norm is None:
+            raise ValueError("Avval load() ni chaqiring.")
+        if any("\n" in w for w in self._words):
+            raise ValueError("So'zlarda yangi qator belgisi bo'lmasligi kerak.")
+        # vaqtinchalik katalogga yozilib os.replace bilan almashtiriladi: ombor
+        # shu katalogdan mmap qilingan bo'lsa ham (load -> build_index ->
+        # save_binary), ochiq fayllar kesilmaydi va yarim yozilgan holat ko'rinmaydi
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=parent, prefix=".tmp-")
+        try:
+            with open(os.path.join(tmp, "vocab.txt"), "w", encoding="utf-8") as f:
+                f.writelines(w + "\n" for w in self._words)
+            if self._quant is None:
+                np.save(os.path.join(tmp, "raw.npy"), np.ascontiguousarray(self._raw))
+            else:
+                np.save(os.path.join(tmp, "row_norms.npy"), self._row_norms)
+                if self._norm_scale is not None:
+                    np.save(os.path.join(tmp, "norm_scale.npy"), self._norm_scale)
+            np.save(os.path.join(tmp, "norm.npy"), np.ascontiguousarray(self._norm))
+            if self._ivf_centroids is not None:
+                self.save_index(tmp)
+            with open(os.path.join(tmp, "header.json"), "w", encoding="utf-8") as f:
+                json.dump({"format": _BIN_FORMAT, "version": _BIN_VERSION,
+                           "n": len(self._words), "dim": self._dim,
+                           "quant": self._quant}, f)
+            _replace_dir(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def _load_binary(self, path: str, max_vocab: int | None = None,
+                     restrict_to: Collection[str] | None = None) -> None:
+        with open(os.path.join(path, "header.json"), encoding="utf-8") as f:
+            header = json.load(f)
+        if header.get("format") != _BIN_FORMAT:
+            raise ValueError(f"{path}: embedding ombori emas.")
+        if header.get("version", 0) > _BIN_VERSION:
+            raise ValueError(
+                f"{path}: ombor versiyasi {header['version']} -- "
+                f"bu kod faqat <= {_BIN_VERSION} ni o'qiydi."
+            )
+        with open(os.path.join(path, "vocab.txt"), encoding="utf-8") as f:
+            words = f.read().split("\n")[:-1]
+
+        def arr(name: str) -> np.ndarray | None:
+            f = os.path.join(path, name + ".npy")
+            return np.load(f, mmap_mode="r") if os.path.exists(f) else None
+
+        quant = header.get("quant")
+        raw = None if quant else arr("raw")
+        norm, scale, row_norms = arr("norm"), arr("norm_scale"), arr("row_norms")
+        keep = self._select(words, max_vocab, restrict_to)
+        if keep is not None:
+            # qism-lug'at: faqat tanlangan qatorlar RAM ga ko'chiriladi
+            words = [words[i] for i in keep]
+            raw, norm, scale, row_norms = (
+                None if a is None else a[keep] for a in (raw, norm, scale, row_norms)
+            )
+        self._words = words
+        self._w2i = {w: i for i, w in enumerate(words)}
+        self._raw, self._norm = raw, norm
+        self._quant, self._norm_scale, self._row_norms = quant, scale, row_norms
+        self._dim = int(header["dim"])
+        if keep is None and os.path.exists(os.path.join(path, "ivf.json")):
+            self.load_index(path)     # qism-lug'atda indeks id lari mos kelmaydi
+
     @staticmethod
-    def _load_text(path: str) -> tuple[list[str], np.ndarray]:
-        words, rows = [], []
+    def _load_text(path: str, max_vocab: int | None = None,
+                   restrict_to: Collection[str] | None = None,
+                   ) -> tuple[list[str], np.ndarray]:
+        """.vec faylni bloklab o'qiydi: har blok bitta vektorlashtirilgan float parse.
+
+        Har qator uchun alohida np.asarray yaratilmaydi -- _BLOCK_LINES qator
+        qiymatlari bitta satrga qo'shilib np.fromstring bilan o'qiladi.
+        """
+        words: list[str] = []
+        blocks: list[np.ndarray] = []
+        dim = 0
+        seen = 0
         with open(path, encoding="utf-8") as f:
-            first = f.readline().split()
+            first = f.readline()
+            head = first.split()
             # sarlavha "n dim" bo'lsa o'tkazib yuboramiz, aks holda ma'lumot
-            if not (len(first) == 2 and first[0].isdigit() and first[1].isdigit()):
-                words.append(first[0])
-                rows.append(np.asarray(first[1:], dtype=np.float32))
-            for line in f:
-                parts = line.rstrip("\n").split(" ")
-                if len(parts) < 2:
+            if len(head) == 2 and head[0].isdigit() and head[1].isdigit():
+                dim = int(head[1])
+                pending = []
+            else:
+                dim = len(head) - 1
+                pending = [first]
+            while max_vocab is None or seen < max_vocab:
+                lines = pending or list(islice(f, _BLOCK_LINES))
+                pending = []
+                if not lines:
+                    break
+                kept: list[str] = []
+                for line in lines:
+                    word, sep, rest = line.rstrip("\n").partition(" ")
+                    if not sep or not rest.strip():
+                        continue
+                    seen += 1
+                    if restrict_to is None or word in restrict_to:
+                        words.append(word)
+                        kept.append(rest)
+                    if max_vocab is not None and seen >= max_vocab:
+                        break
+                if not kept:
                     continue
-                words.append(parts[0])
-                rows.append(np.asarray(parts[1:], dtype=np.float32))
-        return words, np.vstack(rows)
+                vals = np.fromstring(" ".join(kept), dtype=np.float32, sep=" ")
+                if vals.size != len(kept) * dim:
+                    raise ValueError(
+                        f"{path}: vektor o'lchamlari mos emas (kutilgan dim={dim})."
+                    )
+                blocks.append(vals.reshape(len(kept), dim))
+        if not blocks:
+            return words, np.zeros((0, dim), dtype=np.float32)
+        return words, np.concatenate(blocks)
+
+    @staticmethod
+    def _select(words: list[str], max_vocab: int | None,
+                restrict_to: Collection[str] | None) -> np.ndarray | None:
+        """max_vocab / restrict_to bo'yicha saqlanadigan qator indekslari (None -- hammasi)."""
+        if max_vocab is None and restrict_to is None:
+            return None
+        head = words if max_vocab is None else words[:max_vocab]
+        if restrict_to is None:
+            return np.arange(len(head))
+        return np.fromiter((i for i, w in enumerate(head) if w in restrict_to),
+                           dtype=np.int64)
 
     # ─── asosiy metodlar ────────────────────────────────────────────────────────
     def embed(self, word: str) -> np.ndarray:
@@ -66,24 +238,312 @@ class PretrainedEmbedder:
         i = self._w2i.get(word)
         if i is None:
             return np.zeros(self._dim, dtype=np.float32)
-        return self._raw[i].copy()
+        return self._raw_rows([i])[0]      # mmap emas, mustaqil nusxa
 
-    def most_similar(self, word: str, n: int = 5) -> list[tuple[str, float]]:
-        """Kosinus bo'yicha eng o'xshash n ta so'z: [(so'z, o'xshashlik), ...]."""
-        i = self._w2i.get(word)
-        if i is None:
+    def embed_sentences(self, token_lists: list[list[str]], pooling: str = "mean",
+                        word_freq: dict[str, int] | None = None,
+                        sif_a: float = 1e-3) -> np.ndarray:
+        """Token ro'yxatlarini jumla vektorlariga aylantiradi -> (N, dim) float32.
+
+        Ro'yxatlar bitta ragged id massiviga yoyiladi, vektorlar bitta gather
+        bilan olinadi va hujjat bo'yicha np.add.reduceat bilan yig'iladi --
+        har token uchun embed() chaqirilmaydi. OOV tokenlar tashlanadi;
+        birorta ham ma'lum token bo'lmasa -- nol vektor.
+
+        Args:
+            token_lists: [[token, ...], ...] (masalan, m01.preprocess_batch natijasi).
+            pooling:     'mean' -- oddiy o'rtacha; 'sif' -- a/(a+p(w)) og'irlikli
+                         o'rtacha va batch bo'yicha birinchi bosh komponentni olib
+                         tashlash (Arora va boshq., 2017).
+            word_freq:   SIF uchun so'z chastotalari; None bo'lsa p(w) lug'atdagi
+                         o'rin bo'yicha Zipf qonuni bilan taxminlanadi (.vec
+                         fayllar chastota bo'yicha tartiblangan).
+            sif_a:       SIF silliqlash parametri a.
+        """
+        if pooling not in ("mean", "sif"):
+            raise ValueError("pooling 'mean' yoki 'sif' bo'lishi kerak.")
+        N = len(token_lists)
+        out = np.zeros((N, self._dim), dtype=np.float32)
+        lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=N)
+        get = self._w2i.get
+        ids = np.fromiter((get(t, -1) for toks in token_lists for t in toks),
+                          dtype=np.int64, count=int(lengths.sum()))
+        doc = np.repeat(np.arange(N), lengths)
+        known = ids >= 0
+        ids, doc = ids[known], doc[known]
+        if not len(ids):
+            return out
+        vecs = self._raw_rows(ids)
+        if pooling == "sif":
+            vecs *= (sif_a / (sif_a + self._word_probs(ids, word_freq)))[:, None]
+        counts = np.bincount(doc, minlength=N)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        nz = counts > 0                         # bo'sh segmentlar reduceat ga berilmaydi
+        out[nz] = np.add.reduceat(vecs, starts[nz], axis=0) / counts[nz, None]
+        if pooling == "sif" and nz.sum() > 1:
+            X = out[nz]
+            u = np.linalg.svd(X, full_matrices=False)[2][0]
+            out[nz] = X - np.outer(X @ u, u)
+        return out
+
+    def _word_probs(self, ids: np.ndarray, word_freq: dict[str, int] | None) -> np.ndarray:
+        if word_freq is not None:
+            total = sum(word_freq.values()) or 1
+            return np.fromiter((word_freq.get(self._words[i], 0) for i in ids.tolist()),
+                               dtype=np.float32, count=len(ids)) / total
+        # Zipf: p(r) = 1 / (r * H_V), H_V ~ ln V + gamma
+        harmonic = math.log(max(1, len(self._words))) + 0.5772
+        return (1.0 / ((ids + 1) * harmonic)).astype(np.float32)
+
+    def _raw_rows(self, idx) -> np.ndarray:
+        """Xom vektorlar (float32 nusxa); kvantlangan bo'lsa talab bo'yicha dekvantlash."""
+        if self._quant is not None:
+            return self._norm_rows(idx) * self._row_norms[idx][:, None]
+        return np.array(self._raw[idx], dtype=np.float32)
+
+    def most_similar(self, word: str, n: int = 5, exact: bool = False,
+                     nprobe: int | None = None) -> list[tuple[str, float]]:
+        """Kosinus bo'yicha eng o'xshash n ta so'z: [(so'z, o'xshashlik), ...].
+
+        build_index() qurilgan bo'lsa IVF orqali taxminiy qidiradi (exact=True
+        -- to'liq skanerlash); nprobe -- ko'rib chiqiladigan klasterlar soni.
+        """
+        return self.most_similar_batch([word], n, exact=exact, nprobe=nprobe)[0]
+
+    def most_similar_batch(self, words: list[str], n: int = 5,
+                           chunk_size: int | None = None, exact: bool = False,
+                           nprobe: int | None = None,
+                           ) -> list[list[tuple[str, float]]]:
+        """Ko'p so'z uchun most_similar(): natija kirish tartibida, OOV uchun [].
+
+        So'rov vektorlari bitta (Q, dim) matritsaga yig'iladi va lug'at bilan
+        (Q, dim) @ (dim, V) GEMM bo'laklarda hisoblanadi; har qatorning top-n i
+        to'liq argsort emas, np.argpartition bilan tanlanadi. IVF indeksi
+        bo'lsa (va exact=False) har so'rov faqat nprobe ta klasterni ko'radi.
+
+        Args:
+            words:      So'rov so'zlari.
+            n:          Har so'z uchun nechta qo'shni.
+            chunk_size: Bir GEMM dagi so'rovlar soni; None bo'lsa (chunk, V)
+                        o'xshashlik bloki _SIM_BLOCK_ELEMS elementdan oshmaydi.
+            exact:      True -- indeks bo'lsa ham to'liq skanerlash.
+            nprobe:     IVF klasterlari soni (None -- build_index dagi qiymat);
+                        katta -> aniqroq (recall), kichik -> tezroq.
+        """
+        out: list[list[tuple[str, float]]] = [[] for _ in words]
+        known = [(k, self._w2i[w]) for k, w in enumerate(words) if w in self._w2i]
+        V = len(self._words)
+        m = min(n, V - 1)                       # so'rovning o'zi chiqarib tashlanadi
+        if not known or m <= 0:
+            return out
+        if self._ivf_centroids is not None and not exact:
+            probe = self._nprobe if nprobe is None else nprobe
+            for k, i in known:
+                out[k] = self._ivf_search(i, m, probe)
+            return out
+        rows = np.fromiter((i for _, i in known), dtype=np.int64, count=len(known))
+        step = chunk_size or max(1, _SIM_BLOCK_ELEMS // V)
+        for lo in range(0, len(known), step):
+            sub = rows[lo:lo + step]
+            sims = self._scores(self._norm_rows(sub))                  # (q, V)
+            sims[np.arange(len(sub)), sub] = -np.inf                   # o'zini emas
+            top = np.argpartition(-sims, m - 1, axis=1)[:, :m]
+            top_sims = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_sims, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            top_sims = np.take_along_axis(top_sims, order, axis=1)
+            for r, (k, _) in enumerate(known[lo:lo + step]):
+                out[k] = [(self._words[j], float(v))
+                          for j, v in zip(top[r].tolist(), top_sims[r].tolist())]
+        return out
+
+    # ─── IVF taxminiy qo'shnilar indeksi ─────────────────────────────────────
+    def build_index(self, n_lists: int | None = None, nprobe: int = 8,
+                    n_iter: int = 10, sample_size: int = 100_000,
+                    seed: int = 42) -> None:
+        """Sferik k-means asosida IVF indeksini quradi (toza numpy).
+
+        Har so'z eng yaqin markaz ro'yxatiga tushadi; qidiruvda so'rovga eng
+        yaqin nprobe ta ro'yxat skanerlanadi -- O(V*dim) o'rniga taxminan
+        O((L + V*nprobe/L)*dim).
+
+        Args:
+            n_lists:     Klasterlar soni L; None bo'lsa ~4*sqrt(V). Tanlov
+                         hajmidan (min(V, sample_size)) oshmaydi.
+            nprobe:      Standart qidiruv kengligi (recall/tezlik tugmasi).
+            n_iter:      k-means iteratsiyalari.
+            sample_size: Markazlar shu hajmdagi tasodifiy tanlovda o'rganiladi.
+            seed:        Takrorlanuvchanlik uchun.
+        """
+        if self._norm is None:
+            raise ValueError("Avval load() ni chaqiring.")
+        if sample_size < 1 or (n_lists is not None and n_lists < 1):
+            raise ValueError("n_lists va sample_size musbat butun son bo'lishi kerak.")
+        V = len(self._words)
+        rng = np.random.RandomState(seed)
+        sample = self._norm_rows(np.sort(rng.choice(V, min(V, sample_size), replace=False)))
+        # markazlar tanlovdan olinadi -- L tanlov hajmidan katta bo'lolmaydi
+        L = min(len(sample), n_lists or max(1, int(round(4 * math.sqrt(V)))))
+        C = sample[rng.choice(len(sample), L, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = self._nearest_centroid(sample, C)
+            sums = np.zeros_like(C)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=L)
+            filled = counts > 0                          # bo'sh klaster -- eski markaz qoladi
+            norms = np.linalg.norm(sums[filled], axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            C[filled] = sums[filled] / norms
+        step = max(1, _SIM_BLOCK_ELEMS // L)
+        assign = np.concatenate([
+            self._nearest_centroid(self._norm_rows(slice(lo, lo + step)), C)
+            for lo in range(0, V, step)
+        ])
+        self._ivf_ids = np.argsort(assign, kind="stable").astype(np.int64)
+        self._ivf_offsets = np.zeros(L + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=L), out=self._ivf_offsets[1:])
+        self._ivf_centroids = C.astype(np.float32)
+        self._nprobe = nprobe
+
+    @staticmethod
+    def _nearest_centroid(X: np.ndarray, C: np.ndarray) -> np.ndarray:
+        step = max(1, _SIM_BLOCK_ELEMS // len(C))
+        return np.concatenate([
+            np.argmax(np.asarray(X[lo:lo + step]) @ C.T, axis=1)
+            for lo in range(0, len(X), step)
+        ]) if len(X) else np.zeros(0, dtype=np.int64)
+
+    def _ivf_search(self, i: int, m: int, nprobe: int) -> list[tuple[str, float]]:
+        q = self._norm_rows([i])[0]
+        C, off = self._ivf_centroids, self._ivf_offsets
+        nprobe = max(1, min(nprobe, len(C)))
+        probe = np.argpartition(-(C @ q), nprobe - 1)[:nprobe]
+        cand = np.concatenate([self._ivf_ids[off[c]:off[c + 1]] for c in probe])
+        cand = cand[cand != i]
+        if not len(cand):
             return []
-        sims = self._norm @ self._norm[i]
-        order = np.argsort(-sims)
-        out: list[tuple[str, float]] = []
-        for j in order:
-            if int(j) == i:
-                continue
-            out.append((self._words[int(j)], float(sims[int(j)])))
-            if len(out) >= n:
-                break
+        sims = self._norm_rows(cand) @ q
+        k = min(m, len(cand))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(self._words[int(cand[j])], float(sims[j])) for j in top]
+
+    def save_index(self, path: str) -> None:
+        """IVF indeksini katalogga (vektorlar yonida) saqlaydi: ivf_*.npy + ivf.json."""
+        if self._ivf_centroids is None:
+            raise ValueError("Avval build_index() ni chaqiring.")
+        os.makedirs(path, exist_ok=True)
+        # fayllar alohida almashtiriladi (ombor katalogining qolgani tegilmaydi);
+        # ivf.json oxirida -- u yangi massivlar to'liq joyida bo'lgandagina yangilanadi
+        for name in ("ivf_centroids", "ivf_offsets", "ivf_ids"):
+            _save_replace(os.path.join(path, name + ".npy"), getattr(self, "_" + name))
+        meta = os.path.join(path, "ivf.json")
+        with open(meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"n": len(self._words), "n_lists": len(self._ivf_centroids),
+                       "nprobe": self._nprobe}, f)
+        os.replace(meta + ".tmp", meta)
+
+    def load_index(self, path: str) -> None:
+        """save_index() katalogidan IVF indeksini mmap orqali yuklaydi."""
+        with open(os.path.join(path, "ivf.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["n"] != len(self._words):
+            raise ValueError(f"{path}: indeks boshqa lug'at uchun qurilgan.")
+        self._ivf_centroids = np.load(os.path.join(path, "ivf_centroids.npy"), mmap_mode="r")
+        self._ivf_offsets = np.load(os.path.join(path, "ivf_offsets.npy"), mmap_mode="r")
+        self._ivf_ids = np.load(os.path.join(path, "ivf_ids.npy"), mmap_mode="r")
+        self._nprobe = int(meta["nprobe"])
+
+    # ─── kvantlash ─────────────────────────────────────────────────────────────
+    def quantize(self, dtype: str = "int8") -> None:
+        """Vektorlarni ixcham saqlaydi: float16 yoki qator masshtabli int8.
+
+        Faqat normallashtirilgan matritsa saqlanadi (kvantlangan) va har
+        qatorning asl normasi; _raw tashlanadi. Kosinus qidiruvi to'g'ridan-
+        to'g'ri kvantlangan matritsada bajariladi, embed() esa vektorni talab
+        bo'yicha tiklaydi (norm_q * scale * row_norm). Xotira: float16 ~4x,
+        int8 ~8x kam (ikkita float32 matritsaga nisbatan).
+        """
+        if dtype not in ("float16", "int8"):
+            raise ValueError("dtype 'float16' yoki 'int8' bo'lishi kerak.")
+        if self._norm is None:
+            raise ValueError("Avval load() ni chaqiring.")
+        if self._quant is not None:
+            raise ValueError(f"Vektorlar allaqachon kvantlangan ({self._quant}).")
+        V = len(self._words)
+        step = max(1, _SIM_BLOCK_ELEMS // max(1, self._dim))
+        row_norms = np.empty(V, dtype=np.float32)
+        q = np.empty((V, self._dim), dtype=np.float16 if dtype == "float16" else np.int8)
+        scale = np.empty(V, dtype=np.float32) if dtype == "int8" else None
+        for lo in range(0, V, step):                        # bloklab: mmap ham sig'adi
+            hi = min(V, lo + step)
+            raw = np.asarray(self._raw[lo:hi], dtype=np.float32)
+            row_norms[lo:hi] = np.linalg.norm(raw, axis=1)
+            block = np.asarray(self._norm[lo:hi], dtype=np.float32)
+            if scale is None:
+                q[lo:hi] = block
+            else:
+                s = np.abs(block).max(axis=1) / 127.0
+                s[s == 0] = 1.0
+                q[lo:hi] = np.rint(block / s[:, None])
+                scale[lo:hi] = s
+        self._norm, self._norm_scale, self._row_norms = q, scale, row_norms
+        self._raw = None
+        self._quant = dtype
+
+    def _norm_rows(self, idx) -> np.ndarray:
+        """_norm qatorlari (indekslar yoki slice) float32 da, dekvantlangan."""
+        rows = np.asarray(self._norm[idx], dtype=np.float32)
+        if self._norm_scale is not None:
+            rows *= self._norm_scale[idx][:, None]
+        return rows
+
+    def _scores(self, Q: np.ndarray) -> np.ndarray:
+        """(q, dim) so'rovlar x butun lug'at kosinusi -> (q, V) float32."""
+        if self._quant is None:
+            return Q @ self._norm.T
+        V = len(self._words)
+        out = np.empty((len(Q), V), dtype=np.float32)
+        step = max(1, _SIM_BLOCK_ELEMS // max(1, self._dim))
+        for lo in range(0, V, step):
+            # kvantlangan blok faqat shu yerda float32 ga ko'tariladi
+            S = Q @ np.asarray(self._norm[lo:lo + step], dtype=np.float32).T
+            if self._norm_scale is not None:
+                S *= self._norm_scale[lo:lo + step]
+            out[:, lo:lo + step] = S
         return out
 
+    def _drop_index(self) -> None:
+        self._ivf_centroids = self._ivf_offsets = self._ivf_ids = None
+
+    def evaluate_index(self, words: list[str], n: int = 10,
+                       nprobes: tuple[int, ...] = (1, 2, 4, 8, 16, 32),
+                       ) -> list[dict[str, float]]:
+        """Recall@n va so'rov kechikishi: IVF (har nprobe) vs to'liq skanerlash.
+
+        Returns:
+            [{'nprobe': 0, 'recall': 1.0, 'ms_per_query': ...},   # 0 -- exact
+             {'nprobe': 1, 'recall': 0.71, 'ms_per_query': ...}, ...]
+        """
+        if self._ivf_centroids is None:
+            raise ValueError("Avval build_index() ni chaqiring.")
+        words = [w for w in words if w in self._w2i]
+        if not words:
+            return []
+        t0 = time.perf_counter()
+        truth = [{w for w, _ in self.most_similar(q, n, exact=True)} for q in words]
+        report = [{"nprobe": 0, "recall": 1.0,
+                   "ms_per_query": 1e3 * (time.perf_counter() - t0) / len(words)}]
+        for p in nprobes:
+            t0 = time.perf_counter()
+            got = [self.most_similar(q, n, nprobe=p) for q in words]
+            ms = 1e3 * (time.perf_counter() - t0) / len(words)
+            hits = sum(len(t & {w for w, _ in g}) for t, g in zip(truth, got))
+            total = sum(len(t) for t in truth)
+            report.append({"nprobe": p, "recall": hits / total if total else 1.0,
+                           "ms_per_query": ms})
+        return report
+
     def oov_rate(self, texts: list[list[str]]) -> float:
         """Tokenlar orasida lug'atda yo'q so'zlar ulushi [0,1]."""
         total = oov = 0
@@ -12,16 +12,83 @@ bog'liq emas -- har joyda ishlaydi.
 """
 from __future__ import annotations
 
+import glob
+import os
 import pickle
+import re
+import tempfile
 import zlib
-from collections import Counter
+from collections import Counter, OrderedDict
 
 import numpy as np
 
 try:
-    from m01_text_preprocessor import TextPreprocessor
+    from m01_text_preprocessor import TextPreprocessor, _save_replace
 except ImportError:   # paket sifatida import qilinganda
-    from .m01_text_preprocessor import TextPreprocessor
+    from .m01_text_preprocessor import TextPreprocessor, _save_replace
+
+
+_MAX_EDIT = 2   # correct() ko'rib chiqadigan eng katta tahrir masofasi
+# matndagi so'z: harflar (lotin/kirill) + ichki apostrof/chiziqcha (ob-havo bitta
+# so'z); qolgani ajratgich
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['ʻʼ‘’`-][^\W\d_]+)*")
+_LATIN_WORD_RE = re.compile(r"[a-z][a-z']*")
+# _signatures() bir blokda ko'pi bilan shuncha (shingle x num_perm) elementni hisoblaydi
+_SIG_BLOCK_ELEMS = 2**22
+# index_docs: shuncha (kalit, hujjat) juftidan kam qo'shimchalar avval delta
+# buferga tushadi; bufer max(shu, asosiy jadval / 4) ga yetganda CSR ga qo'shiladi
+_DELTA_MIN_PAIRS = 1 << 16
+_BATCH_MIN = 64  # shundan ko'p nomzodda correct() numpy batch masofasidan foydalanadi
+
+
+def _deletes(word: str, max_dist: int = _MAX_EDIT) -> set[str]:
+    """So'zdan ko'pi bilan max_dist ta harf o'chirib hosil bo'ladigan satrlar (o'zi ham).
+
+    SymSpell g'oyasi: Levenshtein(x, w) <= k bo'lsa, x va w ning <= k ta
+    o'chirishdan keyingi umumiy varianti albatta bor.
+    """
+    out = {word}
+    frontier = {word}
+    for _ in range(max_dist):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+# band kaliti -> uint64: FNV-1a uslubidagi aralashtirish + splitmix64 yakunlovchi
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _band_hash(vals: np.ndarray, band: np.ndarray) -> np.ndarray:
+    """(m, rows) band qiymatlari + (m,) band raqami -> (m,) uint64 kalit."""
+    vals = np.asarray(vals, dtype=np.int64).astype(np.uint64)
+    h = _FNV_OFFSET ^ np.asarray(band, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for r in range(vals.shape[1]):
+            h = (h ^ vals[:, r]) * _FNV_PRIME
+        h ^= h >> np.uint64(30)
+        h *= _MIX1
+        h ^= h >> np.uint64(27)
+        h *= _MIX2
+        h ^= h >> np.uint64(31)
+    return h
+
+
+def _csr_postings(keys: np.ndarray, docs: np.ndarray
+                  ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(kalit, hujjat) juftlari -> saralangan noyob kalitlar, ptr, postinglar."""
+    order = np.lexsort((docs, keys))
+    keys, docs = keys[order], docs[order]
+    uniq, first = np.unique(keys, return_index=True)
+    ptr = np.append(first, len(keys)).astype(np.int64)
+    return uniq, ptr, docs.astype(np.int32)
 
 
 def _stable_hash(s: str) -> int:
@@ -36,7 +103,9 @@ class SpellLSHRetriever:
     """
 
     def __init__(self, num_perm: int = 64, bands: int = 16,
-                 alpha_channel: float = 0.1) -> None:
+                 alpha_channel: float = 0.1,
+                 correction_cache_size: int = 50_000,
+                 signature_only: bool = False) -> None:
         self._pre = TextPreprocessor()
         self._num_perm = num_perm
         self._bands = bands
@@ -48,13 +117,38 @@ class SpellLSHRetriever:
         self._p = np.int64(2**31 - 1)
         self._freq: Counter = Counter()
         self._total = 0
+        # SymSpell o'chirish indeksi: o'chirish-varianti -> lug'at so'zlari
+        self._delete_index: dict[str, list[str]] = {}
+        self._order: dict[str, int] = {}    # so'z -> _freq ga birinchi kirgan o'rni
+        # correct() natijalari uchun LRU kesh (lug'at o'zgarsa tozalanadi)
+        self._corr_cache: OrderedDict[str, str] = OrderedDict()
+        self._corr_cache_size = correction_cache_size
         self._docs: list[str] = []
         self._doc_shingles: list[set] = []
-        self._buckets: dict = {}
+        # (N, num_perm) MinHash imzolari; signature_only=True da _doc_shingles
+        # saqlanmaydi, qayta tartiblash imzo bo'yicha Jaccard bahosi bilan
+        self._sigs = np.empty((0, num_perm), dtype=np.uint32)
+        self._sig_buf: np.ndarray | None = None   # _sigs shu buferning [:N] ko'rinishi
+        self._signature_only = signature_only
+        # LSH savatlari CSR ko'rinishida: saralangan uint64 band kalitlari,
+        # kalit j ning hujjatlari -- _bpost[_bptr[j]:_bptr[j+1]]
+        self._bkeys = np.empty(0, dtype=np.uint64)
+        self._bptr = np.zeros(1, dtype=np.int64)
+        self._bpost = np.empty(0, dtype=np.int32)
+        # hali CSR ga qo'shilmagan kichik qo'shimchalar: band kaliti -> hujjatlar
+        self._delta: dict[int, list[int]] = {}
+        self._delta_n = 0
 
     # ─── imlo: Levenshtein + Noisy Channel ──────────────────────────────────────
-    def edit_distance(self, s1: str, s2: str) -> int:
-        """Levenshtein tahrir masofasi (dinamik dasturlash, 2D jadval)."""
+    def edit_distance(self, s1: str, s2: str, max_dist: int | None = None) -> int:
+        """Levenshtein tahrir masofasi (dinamik dasturlash, 2D jadval).
+
+        max_dist=k berilsa -- chegaralangan variant: faqat |i-j| <= k diagonal
+        polosasi to'ldiriladi va qator minimumi k dan oshishi bilan to'xtaydi.
+        Masofa <= k bo'lsa aynan o'sha qiymat, aks holda k + 1 qaytadi.
+        """
+        if max_dist is not None:
+            return self._edit_distance_banded(s1, s2, max_dist)
         m, n = len(s1), len(s2)
         D = [[0] * (n + 1) for _ in range(m + 1)]
         for i in range(m + 1):
@@ -69,11 +163,105 @@ class SpellLSHRetriever:
                     D[i][j] = 1 + min(D[i - 1][j], D[i][j - 1], D[i - 1][j - 1])
         return D[m][n]
 
+    @staticmethod
+    def _edit_distance_banded(s1: str, s2: str, k: int) -> int:
+        m, n = len(s1), len(s2)
+        big = k + 1                      # "k dan katta" -- polosadan tashqari kataklar
+        if abs(m - n) > k:
+            return big
+        prev = [j if j <= k else big for j in range(n + 1)]
+        for i in range(1, m + 1):
+            lo, hi = max(1, i - k), min(n, i + k)
+            cur = [big] * (n + 1)
+            cur[0] = i if i <= k else big
+            row_min = cur[0]
+            c1 = s1[i - 1]
+            for j in range(lo, hi + 1):
+                if c1 == s2[j - 1]:
+                    v = prev[j - 1]
+                else:
+                    v = 1 + min(prev[j], cur[j - 1], prev[j - 1])
+                cur[j] = v if v < big else big
+                if v < row_min:
+                    row_min = v
+            if row_min > k:              # keyingi qatorlar faqat kattalashadi
+                return big
+            prev = cur
+        return prev[n]
+
+    def edit_distance_batch(self, word: str, candidates: list[str],
+                            max_dist: int | None = None) -> np.ndarray:
+        """Bitta so'z va ko'p nomzod orasidagi Levenshtein masofalari (numpy).
+
+        Nomzodlar uzunlik bo'yicha guruhlanadi; har guruh (n, L) kod matritsasi
+        ustida DP qatorma-qator, barcha nomzodlar uchun birdaniga hisoblanadi
+        (qo'shish zanjiri np.minimum.accumulate bilan). Qiymatlar
+        edit_distance() bilan aynan bir xil; max_dist=k bo'lsa k dan kattalari
+        k + 1 ga kesiladi va uzunligi |m - L| > k bo'lgan guruhlar o'tkaziladi.
+
+        Returns:
+            (len(candidates),) int32 masofalar, kirish tartibida.
+        """
+        out = np.empty(len(candidates), dtype=np.int32)
+        m = len(word)
+        q = np.frombuffer(word.encode("utf-32-le"), dtype=np.uint32)
+        groups: dict[int, list[int]] = {}
+        for idx, c in enumerate(candidates):
+            groups.setdefault(len(c), []).append(idx)
+        for L, idxs in groups.items():
+            if max_dist is not None and abs(m - L) > max_dist:
+                out[idxs] = max_dist + 1
+                continue
+            if L == 0 or m == 0:
+                out[idxs] = max(m, L)
+                continue
+            codes = np.frombuffer(
+                "".join(candidates[i] for i in idxs).encode("utf-32-le"), dtype=np.uint32
+            ).reshape(len(idxs), L)
+            cols = np.arange(L + 1, dtype=np.int32)
+            prev = np.broadcast_to(cols, (len(idxs), L + 1))
+            for i in range(1, m + 1):
+                # moslik/almashtirish va o'chirish -- vektorlashtirilgan
+                step = np.minimum(prev[:, :-1] + (codes != q[i - 1]), prev[:, 1:] + 1)
+                x = np.empty_like(prev)
+                x[:, 0] = i
+                x[:, 1:] = step - cols[1:]
+                # qo'shish: cur[j] = min(step[j], cur[j-1] + 1) = j + min_{t<=j}(x[t])
+                prev = np.minimum.accumulate(x, axis=1) + cols
+                if max_dist is not None and (prev.min(axis=1) > max_dist).all():
+                    break
+            res = prev[:, L]
+            if max_dist is not None:
+                res = np.minimum(res, max_dist + 1)
+            out[idxs] = res
+        return out
+
     def fit_dictionary(self, texts: list[str]) -> None:
         """Lug'at chastotalarini (til modeli P(w)) korpusdan o'rganadi."""
         for t in texts:
             self._freq.update(self._pre.preprocess(t))
         self._total = sum(self._freq.values())
+        self._index_new_words()
+        self._corr_cache.clear()
+
+    def _index_new_words(self) -> None:
+        """Yangi lug'at so'zlarini o'chirish indeksiga qo'shadi (bir martalik ish)."""
+        for w in self._freq:
+            if w in self._order:
+                continue
+            self._order[w] = len(self._order)
+            for d in _deletes(w):
+                self._delete_index.setdefault(d, []).append(w)
+
+    def _candidates(self, word: str) -> list[str]:
+        """Masofasi <= _MAX_EDIT bo'lishi mumkin bo'lgan lug'at so'zlari (_freq tartibida)."""
+        found: set[str] = set()
+        index = self._delete_index
+        for d in _deletes(word):
+            hits = index.get(d)
+            if hits:
+                found.update(hits)
+        return sorted(found, key=self._order.__getitem__)
 
     def correct(self, word: str) -> str:
         """Noisy channel: argmax_w P(w)*P(x|w); P(x|w)=alpha^edit_distance."""
@@ -83,37 +271,224 @@ class SpellLSHRetriever:
         if w in self._freq:        # lug'atda bor -> tuzatish shart emas
             return w
         best, best_score = w, -1.0
-        for cand, c in self._freq.items():
-            d = self.edit_distance(w, cand)
-            if d > 2:
+        # butun lug'at o'rniga faqat o'chirish indeksidagi nomzodlar; tartib
+        # _freq bilan bir xil, shuning uchun teng ballarda natija o'zgarmaydi
+        cands = self._candidates(w)
+        if len(cands) >= _BATCH_MIN:
+            dists = self.edit_distance_batch(w, cands, max_dist=_MAX_EDIT).tolist()
+        else:
+            dists = [self.edit_distance(w, c, max_dist=_MAX_EDIT) for c in cands]
+        for cand, d in zip(cands, dists):
+            if d > _MAX_EDIT:
                 continue
-            score = (c / self._total) * (self._alpha ** d)
+            score = (self._freq[cand] / self._total) * (self._alpha ** d)
             if score > best_score:
                 best, best_score = cand, score
         return best
 
+    # ─── matn darajasida tuzatish ───────────────────────────────────────────────
+    def _correct_cached(self, word: str) -> str:
+        cache = self._corr_cache
+        fix = cache.get(word)
+        if fix is not None:
+            cache.move_to_end(word)
+            return fix
+        fix = self.correct(word)
+        if self._corr_cache_size > 0:
+            cache[word] = fix
+            if len(cache) > self._corr_cache_size:
+                cache.popitem(last=False)
+        return fix
+
+    def _is_known(self, norm: str) -> bool:
+        """Tuzatish shart emasmi: qisqa/lotin bo'lmagan, stopword yoki lug'atda (stemi bilan).
+
+        len <= _MAX_EDIT + 1 so'zlar tegilmaydi: 2 tahrir masofasida ularni
+        deyarli istalgan qisqa lug'at so'zi almashtira oladi (oy -> loc).
+        Chiziqchali qo'shma so'zlar (ob-havo) ham tuzatilmaydi.
+        """
+        if len(norm) <= _MAX_EDIT + 1 or not _LATIN_WORD_RE.fullmatch(norm):
+            return True
+        pre = self._pre
+        return (norm in self._freq or norm in pre._stopwords
+                or pre._stem(norm) in self._freq)
+
+    def correct_text(self, text: str) -> str:
+        """Matndagi noma'lum so'zlarni tuzatadi; bo'sh joy va tinish belgilari saqlanadi."""
+        return self.correct_batch([text])[0]
+
+    def correct_batch(self, texts: list[str]) -> list[str]:
+        """Ko'p matnni tuzatadi: noma'lum so'zlar butun batch bo'yicha bir marta.
+
+        So'zlar m01 normalizatsiyasi (apostrof, registr, kirill->lotin) bilan
+        solishtiriladi; lug'atda (yoki stopword) bo'lmaganlari yig'ilib,
+        takrorlarsiz, avval tuzatish keshidan, keyin correct() orqali
+        tuzatiladi. Matn asl oraliqlari bilan qayta yig'iladi; bosh harf
+        saqlanadi.
+
+        Cheklov: lug'at stemlardan iborat (fit_dictionary preprocess() dan
+        o'tkazadi), shuning uchun so'zning o'zi yoki uning prefiksi bo'lgan
+        tuzatish (tili -> til, oldi -> oldim) qo'llanmaydi -- u imlo xatosi
+        emas, qo'shimcha farqi. Lug'atda umuman uchramagan to'g'ri so'zlar
+        baribir yaqin lug'at so'ziga almashishi mumkin; lug'at qancha katta
+        bo'lsa, bunday almashtirishlar shuncha kam.
+        """
+        if not self._total:
+            return list(texts)
+        norm_of: dict[str, str] = {}
+        fixes: dict[str, str] = {}
+        for text in texts:
+            for tok in _WORD_RE.findall(text):
+                norm = norm_of.get(tok)
+                if norm is None:
+                    norm = norm_of[tok] = self._pre._normalize(tok)
+                if norm not in fixes and not self._is_known(norm):
+                    fix = self._correct_cached(norm)
+                    if fix.startswith(norm) or norm.startswith(fix):
+                        fix = norm          # faqat qo'shimcha farqi -- tegilmaydi
+                    fixes[norm] = fix
+
+        def repl(m: re.Match) -> str:
+            tok = m.group()
+            fix = fixes.get(norm_of[tok])
+            if fix is None or fix == norm_of[tok]:
+                return tok
+            if tok.isupper() and len(tok) > 1:
+                return fix.upper()
+            return fix[:1].upper() + fix[1:] if tok[0].isupper() else fix
+
+        return [_WORD_RE.sub(repl, t) for t in texts]
+
     # ─── LSH: MinHash + banding ─────────────────────────────────────────────────
     def _shingles(self, text: str) -> set:
         return set(self._pre.preprocess(text)) if text.strip() else set()
 
-    def _signature(self, shingles: set) -> tuple:
-        if not shingles:
-            return tuple([int(self._p)] * self._num_perm)
-        hs = np.array([_stable_hash(t) for t in shingles], dtype=np.int64)
-        M = (self._a[:, None] * hs[None, :] + self._b[:, None]) % self._p
-        return tuple(int(x) for x in M.min(axis=1))
+    def _signatures(self, shingle_sets: list[set]) -> np.ndarray:
+        """Ko'p to'plam uchun MinHash imzolari, (n, num_perm) int64.
+
+        Barcha shingle lar bitta tekis hash massiviga (hujjat offsetlari bilan)
+        yoziladi; har bir noyob token crc32 bir marta hisoblanadi.
+        (a*h + b) mod p bitta broadcast da, hujjat minimumlari
+        np.minimum.reduceat bilan olinadi. Xotira _SIG_BLOCK_ELEMS bilan
+        cheklanadi. Bo'sh to'plam imzosi -- hamma joyi p.
+        """
+        n, P = len(shingle_sets), self._num_perm
+        out = np.full((n, P), int(self._p), dtype=np.int64)
+        hcache: dict[str, int] = {}
+        max_sh = max(1, _SIG_BLOCK_ELEMS // P)
+        a, b = self._a[None, :], self._b[None, :]
+        i = 0
+        while i < n:
+            # blok: ko'pi bilan max_sh shingle (kamida bitta hujjat)
+            rows, hs, starts, total = [], [], [], 0
+            while i < n and (not rows or total + len(shingle_sets[i]) <= max_sh):
+                sh = shingle_sets[i]
+                if sh:
+                    rows.append(i)
+                    starts.append(total)
+                    for t in sh:
+                        h = hcache.get(t)
+                        if h is None:
+                            h = hcache[t] = _stable_hash(t)
+                        hs.append(h)
+                    total += len(sh)
+                i += 1
+            if not rows:
+                continue
+            H = np.array(hs, dtype=np.int64)[:, None]
+            M = (a * H + b) % self._p
+            out[rows] = np.minimum.reduceat(M, np.array(starts), axis=0)
+        return out
+
+    def _band_keys(self, sigs: np.ndarray) -> np.ndarray:
+        """(n, num_perm) imzolar -> (n, bands) uint64 band kalitlari."""
+        n, B, R = sigs.shape[0], self._bands, self._rows
+        vals = sigs[:, :B * R].reshape(n * B, R)
+        return _band_hash(vals, np.tile(np.arange(B), n)).reshape(n, B)
+
+    def _add_postings(self, keys: np.ndarray, docs: np.ndarray) -> None:
+        """Yangi (kalit, hujjat) juftlarini mavjud CSR jadval bilan birlashtiradi."""
+        if len(self._bkeys):
+            keys = np.concatenate([np.repeat(self._bkeys, np.diff(self._bptr)), keys])
+            docs = np.concatenate([self._bpost, docs])
+        self._bkeys, self._bptr, self._bpost = _csr_postings(keys, docs)
+
+    def _delta_limit(self) -> int:
+        return max(_DELTA_MIN_PAIRS, len(self._bpost) // 4)
+
+    def _add_pairs(self, keys: np.ndarray, docs: np.ndarray) -> None:
+        """Kichik qo'shimcha delta buferga, katta yoki to'lgan -- CSR ga.
+
+        Har index_docs da butun jadvalni qayta saralash kvadratik bo'lardi;
+        chegara asosiy jadvalga proporsional, shuning uchun birlashtirish
+        narxi amortizatsiyada juftga O(log N).
+        """
+        if len(keys) >= self._delta_limit():
+            self._flush_delta()
+            self._add_postings(keys, docs)
+            return
+        delta = self._delta
+        for k, d in zip(keys.tolist(), docs.tolist()):
+            delta.setdefault(k, []).append(d)
+        self._delta_n += len(keys)
+        if self._delta_n >= self._delta_limit():
+            self._flush_delta()
+
+    def _flush_delta(self) -> None:
+        if not self._delta:
+            return
+        keys = np.fromiter((k for k, ds in self._delta.items() for _ in ds),
+                           dtype=np.uint64, count=self._delta_n)
+        docs = np.fromiter((d for ds in self._delta.values() for d in ds),
+                           dtype=np.int64, count=self._delta_n)
+        self._delta, self._delta_n = {}, 0
+        self._add_postings(keys, docs)
+
+    def _append_sigs(self, sigs: np.ndarray) -> None:
+        """Imzolarni ikki baravar o'suvchi buferga qo'shadi (amortizatsiyada O(1))."""
+        n, need = len(self._sigs), len(self._sigs) + len(sigs)
+        buf = self._sig_buf
+        if buf is None or len(buf) < need:
+            buf = np.empty((max(need, 2 * n), self._num_perm), dtype=np.uint32)
+            buf[:n] = self._sigs
+            self._sig_buf = buf
+        buf[n:need] = sigs
+        self._sigs = buf[:need]
 
     def index_docs(self, texts: list[str]) -> None:
-        """Hujjatlarni MinHash LSH indeksiga qo'shadi."""
-        for text in texts:
-            i = len(self._docs)
-            sh = self._shingles(text)
-            self._docs.append(text)
-            self._doc_shingles.append(sh)
-            sig = self._signature(sh)
-            for band in range(self._bands):
-                key = (band, sig[band * self._rows:(band + 1) * self._rows])
-                self._buckets.setdefault(key, set()).add(i)
+        """Hujjatlarni MinHash LSH indeksiga qo'shadi (imzolar bulk hisoblanadi)."""
+        if not texts:
+            return
+        start = len(self._docs)
+        shingles = [self._shingles(text) for text in texts]
+        sigs = self._signatures(shingles).astype(np.uint32)   # qiymatlar <= p < 2**31
+        self._append_sigs(sigs)
+        self._docs.extend(texts)
+        if not self._signature_only:
+            self._doc_shingles.extend(shingles)
+        docs = np.repeat(np.arange(start, start + len(texts)), self._bands)
+        self._add_pairs(self._band_keys(sigs).ravel(), docs)
+
+    def reband(self, bands: int) -> None:
+        """LSH savatlarini boshqa bands/rows bilan qayta quradi (qayta hash siz).
+
+        Saqlangan imzo matritsasidan foydalanadi -- korpus qayta
+        preprocess/hash qilinmaydi. rows = num_perm // bands.
+        """
+        if not 1 <= bands <= self._num_perm:
+            raise ValueError(f"bands 1..{self._num_perm} oralig'ida bo'lishi kerak: {bands}")
+        self._bands, self._rows = bands, self._num_perm // bands
+        self._rebuild_buckets()
+
+    def _rebuild_buckets(self) -> None:
+        self._bkeys = np.empty(0, dtype=np.uint64)
+        self._bptr = np.zeros(1, dtype=np.int64)
+        self._bpost = np.empty(0, dtype=np.int32)
+        self._delta, self._delta_n = {}, 0
+        n = len(self._sigs)
+        if n:
+            docs = np.repeat(np.arange(n), self._bands)
+            self._add_postings(self._band_keys(np.asarray(self._sigs)).ravel(), docs)
 
     @staticmethod
     def _jaccard(a: set, b: set) -> float:
@@ -121,36 +496,114 @@ class SpellLSHRetriever:
             return 0.0
         return len(a & b) / len(a | b)
 
+    def _candidates_for(self, qkeys: np.ndarray) -> np.ndarray:
+        """Bitta so'rovning band kalitlari -> saralangan noyob hujjat indekslari."""
+        parts = []
+        K = self._bkeys
+        if len(K):
+            idx = np.minimum(np.searchsorted(K, qkeys), len(K) - 1)
+            ptr, post = self._bptr, self._bpost
+            parts = [post[ptr[j]:ptr[j + 1]] for j in idx[K[idx] == qkeys]]
+        if self._delta:
+            parts += [np.array(ds, dtype=np.int32) for k in qkeys.tolist()
+                      if (ds := self._delta.get(k))]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(parts))
+
     def lsh_candidates(self, query: str) -> set:
         """LSH savatlaridan nomzod hujjat indekslarini qaytaradi (tezlik uchun)."""
-        sig = self._signature(self._shingles(query))
-        cand = set()
-        for band in range(self._bands):
-            key = (band, sig[band * self._rows:(band + 1) * self._rows])
-            cand |= self._buckets.get(key, set())
-        return cand
+        qkeys = self._band_keys(self._signatures([self._shingles(query)]))[0]
+        return set(self._candidates_for(qkeys).tolist())
 
-    def retrieve_lsh(self, query: str, k: int = 5) -> list[str]:
-        """LSH orqali eng o'xshash k ta hujjatni qaytaradi."""
-        qsh = self._shingles(query)
-        scored = [
-            (self._jaccard(qsh, self._doc_shingles[i]), self._docs[i])
-            for i in self.lsh_candidates(query)
-        ]
+    def _rank(self, qsh: set, cand: np.ndarray, k: int,
+              qsig: np.ndarray | None = None) -> list[str]:
+        # nomzodlar hujjat indeksi bo'yicha saralangan -> tenglikda tartib barqaror
+        if self._signature_only:
+            if not qsh or not len(cand):
+                est = np.zeros(len(cand))
+            else:
+                if qsig is None:
+                    qsig = self._signatures([qsh])[0]
+                # MinHash Jaccard bahosi: teng imzo elementlari ulushi
+                est = (self._sigs[cand] == qsig.astype(np.uint32)).mean(axis=1)
+            top = np.argsort(-est, kind="stable")[:k]
+            return [self._docs[i] for i in cand[top].tolist()]
+        scored = [(self._jaccard(qsh, self._doc_shingles[i]), self._docs[i])
+                  for i in cand.tolist()]
         scored.sort(key=lambda x: -x[0])
         return [doc for _, doc in scored[:k]]
 
+    def retrieve_lsh(self, query: str, k: int = 5) -> list[str]:
+        """LSH orqali eng o'xshash k ta hujjatni qaytaradi."""
+        return self.retrieve_lsh_batch([query], k)[0]
+
+    def retrieve_lsh_batch(self, queries: list[str], k: int = 5) -> list[list[str]]:
+        """Ko'p so'rov uchun retrieve_lsh; imzolar bitta bulk hisobda olinadi."""
+        qshs = [self._shingles(q) for q in queries]
+        qsigs = self._signatures(qshs)
+        qkeys = self._band_keys(qsigs)
+        return [self._rank(qsh, self._candidates_for(qk), k, qsig)
+                for qsh, qk, qsig in zip(qshs, qkeys, qsigs)]
+
     # ─── saqlash / yuklash ──────────────────────────────────────────────────────
     def save(self, path: str) -> None:
+        self._flush_delta()
         state = {
             "num_perm": self._num_perm, "bands": self._bands, "rows": self._rows,
             "alpha": self._alpha, "a": self._a, "b": self._b,
             "freq": self._freq, "total": self._total,
+            "delete_index": self._delete_index, "order": self._order,
             "docs": self._docs, "doc_shingles": self._doc_shingles,
-            "buckets": self._buckets,
+            "buckets_npy": True, "sigs_npy": True,
+            "signature_only": self._signature_only,
         }
-        with open(path, "wb") as f:
-            pickle.dump(state, f)
+        # savat jadvallari va imzolar pickle yonidagi .npy fayllarga (load da mmap).
+        # Har saqlash o'z avlod (gen) nomlari bilan yoziladi, pickle esa eng
+        # oxirida atomik almashtiriladi: u faqat to'liq yozilgan fayllarga
+        # ishora qiladi, yarim yo'lda uzilsa eski artefakt butunligicha qoladi
+        state["lsh_gen"] = gen = os.urandom(4).hex()
+        for name, arr in self._bucket_arrays().items():
+            _save_replace(f"{path}.{gen}.{name}.npy", arr)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                   prefix=".tmp-", suffix=".pkl")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._prune_generations(path, gen)
+
+    @staticmethod
+    def _prune_generations(path: str, gen: str) -> None:
+        """Shu artefaktning eski avlod fayllarini o'chiradi.
+
+        Faqat aynan shu path ga tegishli nomlar olinadi (path.<8 hex>.lsh_*.npy
+        va eski avlodsiz path.lsh_*.npy) -- "idx.bak" kabi boshqa artefaktlar
+        tegilmaydi. Joriy avloddan tashqari eng so'nggi bitta avlod ham
+        qoldiriladi: eski pickle ni o'qib bo'lgan, lekin hali np.load qilmagan
+        parallel load() o'z fayllarini topadi. Undan eskilari o'chiriladi.
+        """
+        own = re.compile(re.escape(path)
+                         + r"\.(?:([0-9a-f]{8})\.)?lsh_(?:keys|ptr|post|sigs)\.npy")
+        by_gen: dict[str | None, list[str]] = {}
+        for f in glob.glob(glob.escape(path) + ".*.npy"):
+            m = own.fullmatch(f)
+            if m and m.group(1) != gen:
+                by_gen.setdefault(m.group(1), []).append(f)
+        if not by_gen:
+            return
+        prev = max(by_gen, key=lambda g: max(os.path.getmtime(f) for f in by_gen[g]))
+        for g, files in by_gen.items():
+            if g != prev:
+                for f in files:
+                    os.unlink(f)
+
+    def _bucket_arrays(self) -> dict[str, np.ndarray]:
+        return {"lsh_keys": self._bkeys, "lsh_ptr": self._bptr, "lsh_post": self._bpost,
+                "lsh_sigs": self._sigs}
 
     def load(self, path: str) -> None:
         with open(path, "rb") as f:
@@ -160,5 +613,24 @@ class SpellLSHRetriever:
         self._alpha, self._a, self._b = s["alpha"], s["a"], s["b"]
         self._p = np.int64(2**31 - 1)
         self._freq, self._total = s["freq"], s["total"]
+        self._delete_index = s.get("delete_index", {})
+        self._order = s.get("order", {})
+        self._index_new_words()       # eski artefaktlar uchun indeks qayta quriladi
+        self._corr_cache = OrderedDict()
+        self._corr_cache_size = getattr(self, "_corr_cache_size", 50_000)
         self._docs, self._doc_shingles = s["docs"], s["doc_shingles"]
-        self._buckets = s["buckets"]
+        self._signature_only = s.get("signature_only", False)
+        self._sig_buf = None
+        self._delta, self._delta_n = {}, 0
+        gen = s.get("lsh_gen")
+        side = f"{path}.{gen}." if gen else f"{path}."
+        if s.get("sigs_npy"):
+            self._sigs = np.load(f"{side}lsh_sigs.npy", mmap_mode="r")
+        else:   # eski artefakt: imzolar shingle lardan qayta hisoblanadi
+            self._sigs = self._signatures(self._doc_shingles).astype(np.uint32)
+        if s.get("buckets_npy"):
+            self._bkeys, self._bptr, self._bpost = (
+                np.load(f"{side}{name}.npy", mmap_mode="r")
+                for name in ("lsh_keys", "lsh_ptr", "lsh_post"))
+        else:
+            self._rebuild_buckets()